@@ -1,8 +1,14 @@
 from flask import Flask, request, jsonify
 from celery import Celery
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
 from app.database import db, migrate
+from app.utils.db_pool import build_engine_options, install_transaction_statement_timeout
+from app.utils.query_stats import init_query_stats
+from app.utils.rate_limit import init_rate_limiting
+from app.utils.json_provider import init_json_provider
+from app.utils.compression import init_compression
 import logging
 
 # Configure logging
@@ -14,14 +20,36 @@ celery = Celery(__name__)
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    init_json_provider(app)
+    
+    # Client addresses from the trusted proxies' X-Forwarded-For
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
+    # Connection pool sizing, timeouts and instrumentation
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
+    if app.config.get('DB_PGBOUNCER_MODE') and app.config.get('DB_STATEMENT_TIMEOUT_MS'):
+        install_transaction_statement_timeout(app.config['DB_STATEMENT_TIMEOUT_MS'])
     
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     
+    # Per-request query counts and N+1 detection
+    init_query_stats(app)
+    
+    # Load shedding and per-client rate limits
+    init_rate_limiting(app)
+    
+    # Content-encoding negotiation for large responses
+    init_compression(app)
+    
     # Initialize Celery
     celery.conf.update(app.config)
 
+    # Register cross-process cache invalidation and slow-query hooks
+    from app.utils import catalog, analytics, db_routing, slow_queries  # noqa: F401
+
     # Configure CORS globally
     CORS(app, 
         origins=["http://localhost:3000"],
@@ -49,6 +77,8 @@ def create_app(config_class=Config):
     from app.api.v1.users.routes import users_bp
     from app.api.v1.health.routes import health_bp
     from app.api.v1.performance.routes import performance_bp
+    from app.api.v1.sync.routes import sync_bp
+    from app.api.v1.coaches.routes import coach_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(exercises_bp, url_prefix='/api/v1/exercises')
@@ -56,5 +86,7 @@ def create_app(config_class=Config):
     app.register_blueprint(users_bp, url_prefix='/api/v1/users')
     app.register_blueprint(health_bp, url_prefix='/api/v1/health')
     app.register_blueprint(performance_bp, url_prefix='/api/v1/performance')
+    app.register_blueprint(sync_bp, url_prefix='/api/v1/sync')
+    app.register_blueprint(coach_bp, url_prefix='/api/v1/coaches')
 
     return app
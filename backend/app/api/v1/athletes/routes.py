@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.models import AthleteProgram, WorkoutExercise, PerformanceLog
 from app.utils.auth import athlete_required, get_current_user
+from app.utils.etags import workout_etag, not_modified, with_etag
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 
@@ -47,7 +48,11 @@ def get_todays_workout(program_id):
         if not workout:
             return jsonify({'message': 'No workout scheduled for today'}), 404
         
-        return jsonify(workout.to_dict(include_exercises=True)), 200
+        etag = workout_etag(workout.id)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        return with_etag(jsonify(workout.to_dict(include_exercises=True)), etag), 200
     except SQLAlchemyError as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2,13 +2,19 @@ from flask import Blueprint, request, jsonify, current_app
 from app.models import User
 from app.database import db
 from app.utils.auth import create_access_token, jwt_required, get_current_user
-from werkzeug.security import check_password_hash
+from app.utils.passwords import HashingBusy, hash_password, verify_password
 import logging
 
 logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
+def _busy_response(error):
+    """Shed load while the password hashing pool is saturated."""
+    response = jsonify({'error': 'Too many sign-ins right now, please retry shortly'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 @auth_bp.route('/login', methods=['POST', 'OPTIONS'])
 def login():
     """Authenticate a user and return a token."""
@@ -26,12 +32,19 @@ def login():
             
         # Check user credentials
         user = User.query.filter_by(email=data['email']).first()
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user:
+            logger.error('Invalid email or password for login attempt')
+            return jsonify({'error': 'Invalid email or password'}), 401
+        matches, upgraded = verify_password(user, data['password'])
+        if not matches:
             logger.error('Invalid email or password for login attempt')
             return jsonify({'error': 'Invalid email or password'}), 401
+        if upgraded:
+            # Stored hash used outdated parameters; keep the rehashed one
+            db.session.commit()
         
         # Generate access token
-        token = create_access_token(user.id)
+        token = create_access_token(user.id, role=user.role)
         
         response = jsonify({
             'token': token,
@@ -40,6 +53,8 @@ def login():
         
         return response, 200
         
+    except HashingBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error('Login error: %s', str(e))
         return jsonify({'error': 'An error occurred during login'}), 500
@@ -81,7 +96,7 @@ def register():
             email=data['email'],
             role=data['role']
         )
-        user.password = data['password']  # Using the password property instead of set_password
+        user.password_hash = hash_password(data['password'])
         
         # Add user to database
         db.session.add(user)
@@ -90,7 +105,7 @@ def register():
         logger.info('New user registered: %s', user.email)
         
         # Generate access token for immediate login
-        token = create_access_token(user.id)
+        token = create_access_token(user.id, role=user.role)
         
         return jsonify({
             'message': 'Registration successful',
@@ -98,6 +113,8 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except HashingBusy as e:
+        return _busy_response(e)
     except Exception as e:
         logger.error('Registration error: %s', str(e), exc_info=True)
         return jsonify({'error': f'Registration error: {str(e)}'}), 500
@@ -1,10 +1,22 @@
-from flask import Blueprint, request, jsonify
+from datetime import date
+from flask import Blueprint, request, jsonify, current_app
 from app.models import Program, User, Workout, Exercise, WorkoutExercise
 from app.utils.auth import coach_required, get_current_user
+from app.utils.dashboard import get_coach_dashboard
+from app.utils.etags import program_etag, not_modified, with_etag
 from sqlalchemy.exc import SQLAlchemyError
 
 coach_bp = Blueprint('coaches', __name__)
 
+@coach_bp.route('/dashboard', methods=['GET'])
+@coach_required
+def get_dashboard():
+    """Get a roster summary of every athlete on the coach's active programs."""
+    try:
+        return jsonify(get_coach_dashboard(get_current_user().id)), 200
+    except SQLAlchemyError as e:
+        return jsonify({'error': str(e)}), 500
+
 @coach_bp.route('/programs', methods=['POST'])
 @coach_required
 def create_program():
@@ -51,7 +63,11 @@ def get_program(program_id):
     if program.coach_id != get_current_user().id:
         return jsonify({'error': 'Not authorized to view this program'}), 403
     
-    return jsonify(program.to_dict(include_workouts=True)), 200
+    etag = program_etag(program_id)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(jsonify(program.to_dict(include_workouts=True)), etag), 200
 
 @coach_bp.route('/programs/<int:program_id>', methods=['PUT'])
 @coach_required
@@ -164,3 +180,71 @@ def assign_program(program_id):
         }), 201
     except SQLAlchemyError as e:
         return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/programs/<int:program_id>/assign/bulk', methods=['POST'])
+@coach_required
+def bulk_assign_program(program_id):
+    """Assign a program to a whole team of athletes in one statement."""
+    program = Program.query.get_or_404(program_id)
+    
+    if program.coach_id != get_current_user().id:
+        return jsonify({'error': 'Not authorized to assign this program'}), 403
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('athlete_ids'), list) or not data['athlete_ids'] \
+            or not data.get('start_date'):
+        return jsonify({'error': 'A list of athlete_ids and a start_date are required'}), 400
+    athlete_ids = data['athlete_ids']
+    if not all(isinstance(athlete_id, int) for athlete_id in athlete_ids):
+        return jsonify({'error': 'athlete_ids must be integers'}), 400
+    
+    max_athletes = current_app.config.get('BULK_ASSIGN_MAX_ATHLETES', 500)
+    if len(athlete_ids) > max_athletes:
+        return jsonify({'error': f'At most {max_athletes} athletes can be assigned per request'}), 400
+    
+    try:
+        start_date = date.fromisoformat(data['start_date'])
+        end_date = date.fromisoformat(data['end_date']) if data.get('end_date') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Dates must use YYYY-MM-DD'}), 400
+    
+    try:
+        assignments = program.assign_to_athletes(athlete_ids, start_date, end_date)
+        assigned = {athlete_id for _, athlete_id in assignments}
+        return jsonify({
+            'message': f'Program assigned to {len(assignments)} athletes',
+            'assignments': [
+                {'id': assignment_id, 'athlete_id': athlete_id}
+                for assignment_id, athlete_id in assignments
+            ],
+            # Not athletes, or already on this program
+            'skipped': sorted(set(athlete_ids) - assigned)
+        }), 201
+    except SQLAlchemyError as e:
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/programs/<int:program_id>/clone', methods=['POST'])
+@coach_required
+def clone_program(program_id):
+    """Copy a program with all of its workouts and exercises."""
+    program = Program.query.get_or_404(program_id)
+    coach = get_current_user()
+    
+    if program.coach_id != coach.id:
+        return jsonify({'error': 'Not authorized to clone this program'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        result = program.clone(coach.id, name=data.get('name'))
+        if result is None:
+            return jsonify({'error': 'Program not found'}), 404
+        clone = Program.query.get(result['program_id'])
+        return jsonify({
+            'message': 'Program cloned successfully',
+            'program': clone.to_dict(),
+            'workout_count': result['workout_count'],
+            'exercise_count': result['exercise_count']
+        }), 201
+    except SQLAlchemyError as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,23 +1,53 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, make_response
 from app.models import Exercise
 from app.database import db
 from app.utils.auth import jwt_required, coach_required
+from app.utils.pagination import encode_cursor, decode_cursor, get_page_limit
+from app.utils.catalog import get_catalog
+from app.utils.serializers import exercise_serializer
+from app.utils.etags import exercise_etag, not_modified, with_etag
 from sqlalchemy.exc import SQLAlchemyError
 
 exercises_bp = Blueprint('exercises', __name__)
 
+def normalize_muscles(muscles):
+    """Lower-case and de-duplicate a list of muscle names."""
+    if not muscles:
+        return []
+    if isinstance(muscles, str):
+        muscles = muscles.split(',')
+    return sorted({muscle.strip().lower() for muscle in muscles if muscle.strip()})
+
 @exercises_bp.route('', methods=['GET', 'OPTIONS'])
 @jwt_required
 def get_exercises():
-    """Get all exercises."""
+    """Get exercises from the catalog snapshot, paginated by ID."""
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
     try:
-        exercises = Exercise.query.all()
-        return jsonify({
-            'exercises': [exercise.to_dict() for exercise in exercises]
-        }), 200
+        catalog = get_catalog()
+        # The page for a given URL only changes when the catalog does
+        if request.if_none_match.contains_weak(catalog.etag):
+            response = make_response('', 304)
+            response.set_etag(catalog.etag)
+            return response
+
+        fields = exercise_serializer.parse_fields()
+        after_id = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            after_id = decode_cursor(cursor, [Exercise.id])[0]
+
+        exercises, last_id = catalog.page(after_id, get_page_limit())
+        response = jsonify({
+            'exercises': [exercise_serializer.project(exercise, fields) for exercise in exercises],
+            'next_cursor': encode_cursor([last_id]) if last_id is not None else None
+        })
+        response.set_etag(catalog.etag)
+        return response, 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except SQLAlchemyError as e:
         return jsonify({'error': str(e)}), 500
 
@@ -29,8 +59,14 @@ def get_exercise(exercise_id):
         return jsonify({}), 200
         
     try:
-        exercise = Exercise.query.get_or_404(exercise_id)
-        return jsonify(exercise.to_dict()), 200
+        exercise = get_catalog().get(exercise_id)
+        if exercise is None:
+            return jsonify({'error': f'Exercise with id {exercise_id} not found'}), 404
+        etag = exercise_etag(exercise)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        return with_etag(jsonify(exercise), etag), 200
     except SQLAlchemyError as e:
         return jsonify({'error': str(e)}), 500
 
@@ -51,7 +87,8 @@ def create_exercise():
             name=data['name'],
             type=data['type'],
             description=data.get('description'),
-            video_url=data.get('video_url')
+            video_url=data.get('video_url'),
+            muscles_worked=normalize_muscles(data.get('muscles_worked'))
         )
         exercise.save()
         
@@ -85,7 +122,7 @@ def update_exercise(exercise_id):
         if 'equipment' in data:
             exercise.equipment = data['equipment']
         if 'muscles_worked' in data:
-            exercise.muscles_worked = data['muscles_worked']
+            exercise.muscles_worked = normalize_muscles(data['muscles_worked'])
         
         exercise.save()
         return jsonify({
@@ -98,25 +135,27 @@ def update_exercise(exercise_id):
 @exercises_bp.route('/search', methods=['GET', 'OPTIONS'])
 @jwt_required
 def search_exercises():
-    """Search exercises by name, type, or muscles worked."""
+    """Search exercises by name, type, or muscles worked, ranked by relevance."""
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
-    query = request.args.get('q', '').lower()
+    query = request.args.get('q', '')
     type = request.args.get('type')
     muscle = request.args.get('muscle')
+    prefix = request.args.get('mode') == 'prefix'
+    limit = max(1, min(
+        request.args.get('limit', current_app.config.get('EXERCISE_SEARCH_LIMIT', 25), type=int),
+        current_app.config.get('PAGINATION_MAX_LIMIT', 200)
+    ))
     
     try:
-        exercises = Exercise.query
-        
-        if query:
-            exercises = exercises.filter(Exercise.name.ilike(f'%{query}%'))
-        if type:
-            exercises = exercises.filter(Exercise.type == type)
-        if muscle:
-            exercises = exercises.filter(Exercise.muscles_worked.contains(muscle))
-        
-        results = exercises.all()
+        results = Exercise.search(
+            query,
+            exercise_type=type,
+            muscle=muscle,
+            prefix=prefix,
+            limit=limit
+        )
         return jsonify({
             'exercises': [exercise.to_dict() for exercise in results]
         }), 200
@@ -1,5 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from app.database import db
+from app.utils.db_pool import pool_metrics
+from app.utils.auth import admin_token_required
+from app.utils.query_stats import query_metrics
+from app.utils.slow_queries import recent_slow_queries
 from redis import Redis
 import os
 
@@ -52,3 +56,32 @@ def health_check():
     
     status_code = 200 if health_status['status'] == 'healthy' else 503
     return jsonify(health_status), status_code
+
+@health_bp.route('/pool', methods=['GET'])
+@admin_token_required
+def pool_status():
+    """Report connection pool usage and checkout latency for this process."""
+    return jsonify({
+        'pid': os.getpid(),
+        'pools': pool_metrics(db.engines)
+    }), 200
+
+@health_bp.route('/queries', methods=['GET'])
+@admin_token_required
+def query_status():
+    """Report query counts, DB time and flagged N+1 requests per endpoint for this process."""
+    return jsonify({
+        'pid': os.getpid(),
+        'endpoints': query_metrics.snapshot()
+    }), 200
+
+@health_bp.route('/slow-queries', methods=['GET'])
+@admin_token_required
+def slow_queries():
+    """List recent slow queries with their sampled EXPLAIN plans, newest first."""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    include_plans = request.args.get('plans', 'true').lower() == 'true'
+    entries = recent_slow_queries(limit)
+    if not include_plans:
+        entries = [{key: value for key, value in entry.items() if key != 'plan'} for entry in entries]
+    return jsonify({'slow_queries': entries}), 200
@@ -1,45 +1,279 @@
-from flask import jsonify, request
+import os
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy.exc import SQLAlchemyError
+from app.database import db
 from app.models.performance_log import PerformanceLog
+from app.models.performance_log_pose import PerformanceLogPose
 from app.models.workout_exercise import WorkoutExercise
+from app.models.athlete_program import AthleteProgram
+from app.models.program import Program
 from app.utils.auth import login_required, get_current_user
+from app.utils.archive import archived_logs_page, archived_until
+from app.utils.pagination import paginate, encode_cursor, decode_cursor, get_page_limit
+from app.utils.serializers import performance_log_serializer
+from app.utils.analytics import get_training_analytics
+from app.utils.export import export_batches, ndjson_chunks, csv_chunks, gzip_chunks
+from app.utils.cache import get_redis
+from app.utils.etags import content_etag, not_modified, with_etag
+from app.utils.json_provider import json_stream_response, stream_json_text
+from app.utils.importer import (
+    import_history_file, set_import_status, get_import_status, ImportStatusUnavailable
+)
 from . import performance_bp
 
+def logs_page(query, athlete_id, exercise_id=None, workout_id=None):
+    """Respond with a page of an athlete's logs, newest first.
+
+    Logs still in Postgres and the athlete's archived logs are merged by
+    (logged_at, id) under the same cursor, so clients page through the
+    whole history in order without knowing where each set is stored.
+    """
+    cursor_columns = [PerformanceLog.logged_at, PerformanceLog.id]
+    try:
+        fields = performance_log_serializer.parse_fields()
+        logs, live_cursor = paginate(
+            performance_log_serializer.apply(query, fields, PerformanceLog.logged_at),
+            cursor_columns,
+            descending=True
+        )
+        before = None
+        if request.args.get('cursor'):
+            before = tuple(decode_cursor(request.args['cursor'], cursor_columns))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    limit = get_page_limit()
+    # The archive is only read once the page reaches back past its newest month
+    until = archived_until(athlete_id)
+    if until is None or (live_cursor is not None and logs[-1].logged_at >= until):
+        archived, archive_more = [], False
+    else:
+        archived, archive_more = archived_logs_page(
+            athlete_id,
+            [column.key for column in performance_log_serializer.columns_for(fields)],
+            before=before,
+            limit=limit,
+            exercise_id=exercise_id,
+            workout_id=workout_id
+        )
+
+    # A set archived by a run whose delete has not committed yet is in both
+    live_ids = {log.id for log in logs}
+    merged = [(log.logged_at, log.id, log) for log in logs]
+    merged.extend(
+        (row['logged_at'], row['id'], SimpleNamespace(**row))
+        for row in archived if row['id'] not in live_ids
+    )
+    merged.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+
+    next_cursor = None
+    if len(merged) > limit or live_cursor is not None or archive_more:
+        merged = merged[:limit]
+        next_cursor = encode_cursor([merged[-1][0], merged[-1][1]])
+
+    return jsonify({
+        'logs': [performance_log_serializer.dump(entry[2], fields) for entry in merged],
+        'next_cursor': next_cursor
+    }), 200
+
 @performance_bp.route('/', methods=['GET'])
 @login_required
 def get_performance_logs():
-    """Get performance logs for the current user."""
+    """Get performance logs for the current user, newest first."""
     user = get_current_user()
-    logs = PerformanceLog.query.filter_by(athlete_id=user.id).order_by(
-        PerformanceLog.logged_at.desc()
-    ).all()
-    return jsonify([log.to_dict() for log in logs]), 200
+    query = PerformanceLog.query.filter_by(athlete_id=user.id)
+    return logs_page(query, user.id)
 
 @performance_bp.route('/exercise/<int:exercise_id>', methods=['GET'])
 @login_required
 def get_exercise_performance(exercise_id):
     """Get performance logs for a specific exercise."""
     user = get_current_user()
-    logs = PerformanceLog.query.join(
+    query = PerformanceLog.query.join(
         WorkoutExercise
     ).filter(
         PerformanceLog.athlete_id == user.id,
         WorkoutExercise.exercise_id == exercise_id
-    ).order_by(
-        PerformanceLog.logged_at.desc()
-    ).all()
-    return jsonify([log.to_dict() for log in logs]), 200
+    )
+    return logs_page(query, user.id, exercise_id=exercise_id)
 
 @performance_bp.route('/workout/<int:workout_id>', methods=['GET'])
 @login_required
 def get_workout_performance(workout_id):
     """Get performance logs for a specific workout."""
     user = get_current_user()
-    logs = PerformanceLog.query.join(
+    query = PerformanceLog.query.join(
         WorkoutExercise
     ).filter(
         PerformanceLog.athlete_id == user.id,
         WorkoutExercise.workout_id == workout_id
-    ).order_by(
-        PerformanceLog.logged_at.desc()
-    ).all()
-    return jsonify([log.to_dict() for log in logs]), 200
+    )
+    return logs_page(query, user.id, workout_id=workout_id)
+
+@performance_bp.route('/<int:log_id>/pose', methods=['GET'])
+@login_required
+def get_pose_data(log_id):
+    """Get the pose data recorded for one set.
+
+    Listings leave pose data out; clients fetch it here only for the sets
+    they replay.
+    """
+    user = get_current_user()
+    owned = PerformanceLog.query.with_entities(PerformanceLog.id).filter_by(
+        id=log_id, athlete_id=user.id
+    ).first()
+    if not owned:
+        return jsonify({'error': 'Performance log not found'}), 404
+
+    # Payloads run to megabytes of landmark arrays; stream the stored text as is
+    pose_json = PerformanceLogPose.get_json_for_log(log_id)
+    if pose_json is None:
+        return jsonify({'error': 'No pose data for this set'}), 404
+    etag = content_etag('pose', pose_json)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(json_stream_response(stream_json_text(
+        pose_json, head=f'{{"performance_log_id":{log_id},"pose_data":', tail='}'
+    )), etag)
+
+@performance_bp.route('/analytics', methods=['GET'])
+@login_required
+def get_analytics():
+    """Get e1RM trends, acute:chronic workload ratio and monotony for an athlete.
+
+    Athletes get their own analytics; coaches pass athlete_id for an athlete
+    assigned to one of their programs.
+    """
+    user = get_current_user()
+    athlete_id = request.args.get('athlete_id', type=int) or user.id
+
+    if athlete_id != user.id:
+        if user.role != 'coach':
+            return jsonify({'error': 'Not authorized to view this athlete'}), 403
+        coached = AthleteProgram.query.join(Program).filter(
+            AthleteProgram.athlete_id == athlete_id,
+            Program.coach_id == user.id
+        ).first()
+        if not coached:
+            return jsonify({'error': 'Not authorized to view this athlete'}), 403
+
+    try:
+        return jsonify(get_training_analytics(athlete_id)), 200
+    except SQLAlchemyError as e:
+        return jsonify({'error': str(e)}), 500
+
+@performance_bp.route('/export', methods=['GET'])
+@login_required
+def export_logs():
+    """Stream training history as NDJSON or CSV in constant memory.
+
+    Query parameters: format (ndjson or csv), athlete_id, exercise_id,
+    from and to (YYYY-MM-DD, inclusive) and gzip=1 to compress on the fly.
+    Athletes export their own history; coaches export one athlete or, without
+    athlete_id, every athlete assigned to their programs.
+    """
+    user = get_current_user()
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+    try:
+        date_from = request.args.get('from')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+        date_to = request.args.get('to')
+        date_to = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+    except ValueError:
+        return jsonify({'error': 'Dates must use YYYY-MM-DD'}), 400
+
+    athlete_id = request.args.get('athlete_id', type=int)
+    if user.role == 'coach':
+        roster = [
+            row.athlete_id for row in db.session.query(AthleteProgram.athlete_id).join(Program).filter(
+                Program.coach_id == user.id
+            ).distinct()
+        ]
+        if athlete_id and athlete_id not in roster:
+            return jsonify({'error': 'Not authorized to view this athlete'}), 403
+        athlete_ids = [athlete_id] if athlete_id else roster
+    else:
+        if athlete_id and athlete_id != user.id:
+            return jsonify({'error': 'Not authorized to view this athlete'}), 403
+        athlete_ids = [user.id]
+
+    batches = export_batches(
+        athlete_ids,
+        exercise_id=request.args.get('exercise_id', type=int),
+        date_from=date_from,
+        date_to=date_to,
+        batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    )
+    chunks = ndjson_chunks(batches) if export_format == 'ndjson' else csv_chunks(batches)
+    filename = f'performance_logs.{export_format}'
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    if request.args.get('gzip', '').lower() in ('1', 'true'):
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@performance_bp.route('/imports', methods=['POST'])
+@login_required
+def start_import():
+    """Upload a CSV of historical sets and import it in the background.
+
+    Athletes import their own history; coaches pass athlete_id for an
+    athlete assigned to one of their programs. Poll the returned status URL
+    for progress, throughput and rejected rows.
+    """
+    user = get_current_user()
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'A CSV file is required'}), 400
+    if get_redis() is None:
+        return jsonify({'error': 'Background imports are unavailable'}), 503
+
+    athlete_id = request.form.get('athlete_id', type=int) or user.id
+    if athlete_id != user.id:
+        if user.role != 'coach':
+            return jsonify({'error': 'Not authorized to import for this athlete'}), 403
+        coached = AthleteProgram.query.join(Program).filter(
+            AthleteProgram.athlete_id == athlete_id,
+            Program.coach_id == user.id
+        ).first()
+        if not coached:
+            return jsonify({'error': 'Not authorized to import for this athlete'}), 403
+
+    job_id = uuid.uuid4().hex
+    upload_dir = current_app.config['IMPORT_UPLOAD_FOLDER']
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f'{job_id}.csv')
+    upload.save(path)
+
+    set_import_status(job_id, 'queued', user_id=user.id, athlete_id=athlete_id)
+    import_history_file.delay(job_id, path, athlete_id, user.id)
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/v1/performance/imports/{job_id}'
+    }), 202
+
+@performance_bp.route('/imports/<job_id>', methods=['GET'])
+@login_required
+def get_import(job_id):
+    """Get the progress of a background import."""
+    try:
+        status = get_import_status(job_id)
+    except ImportStatusUnavailable:
+        return jsonify({'error': 'Import status is unavailable, please retry shortly'}), 503
+    if not status or status.get('user_id') != get_current_user().id:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify(status), 200
@@ -0,0 +1,302 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import tuple_, or_, and_
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from app.database import db
+from app.models import (
+    Exercise, Program, Workout, WorkoutExercise, AthleteProgram,
+    PerformanceLog, Tombstone, SyncReceipt
+)
+from app.utils.auth import jwt_required, get_current_user
+import logging
+
+logger = logging.getLogger(__name__)
+
+sync_bp = Blueprint('sync', __name__)
+
+SYNCED_MODELS = {
+    'exercises': Exercise,
+    'programs': Program,
+    'workouts': Workout,
+    'workout_exercises': WorkoutExercise,
+    'athlete_programs': AthleteProgram,
+    'performance_logs': PerformanceLog,
+}
+
+class SyncError(Exception):
+    def __init__(self, message, status_code=400):
+        self.message = message
+        self.status_code = status_code
+
+@sync_bp.errorhandler(SyncError)
+def handle_sync_error(error):
+    response = jsonify({'error': error.message})
+    response.status_code = error.status_code
+    return response
+
+def encode_sync_token(marks):
+    """Encode per-entity high-water marks into an opaque token."""
+    raw = json.dumps(marks, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_sync_token(token):
+    """Decode a sync token into per-entity high-water marks."""
+    if not token:
+        return {}
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        marks = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise SyncError('Invalid sync token')
+    if not isinstance(marks, dict):
+        raise SyncError('Invalid sync token')
+    return marks
+
+def scoped_query(entity, user):
+    """Return the query of rows of an entity visible to the user."""
+    model = SYNCED_MODELS[entity]
+    if user.role == 'coach':
+        program_ids = db.session.query(Program.id).filter(Program.coach_id == user.id)
+    else:
+        program_ids = db.session.query(AthleteProgram.program_id).filter(
+            AthleteProgram.athlete_id == user.id
+        )
+
+    if entity == 'exercises':
+        return model.query
+    if entity == 'programs':
+        return model.query.filter(Program.id.in_(program_ids))
+    if entity == 'workouts':
+        return model.query.filter(Workout.program_id.in_(program_ids))
+    if entity == 'workout_exercises':
+        workout_ids = db.session.query(Workout.id).filter(Workout.program_id.in_(program_ids))
+        return model.query.filter(WorkoutExercise.workout_id.in_(workout_ids))
+    if entity == 'athlete_programs':
+        if user.role == 'coach':
+            return model.query.filter(AthleteProgram.program_id.in_(program_ids))
+        return model.query.filter(AthleteProgram.athlete_id == user.id)
+    # Performance logs are private to the athlete who logged them
+    return model.query.filter(PerformanceLog.athlete_id == user.id)
+
+def tombstone_scope(user):
+    """Filter for tombstones visible to the user, mirroring scoped_query.
+
+    Coaches also see roster rows removed from their programs, which carry
+    the athlete's ID rather than theirs.
+    """
+    visible = or_(Tombstone.athlete_id.is_(None), Tombstone.athlete_id == user.id)
+    if user.role != 'coach':
+        return visible
+    program_ids = db.session.query(Program.id).filter(Program.coach_id == user.id)
+    return or_(visible, and_(
+        Tombstone.entity == 'athlete_programs',
+        Tombstone.program_id.in_(program_ids)
+    ))
+
+@sync_bp.route('', methods=['GET', 'OPTIONS'])
+@jwt_required
+def pull_changes():
+    """Return rows created, changed or deleted since the client's sync token."""
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+
+    try:
+        user = get_current_user()
+        marks = decode_sync_token(request.args.get('since'))
+        limit = max(1, min(
+            request.args.get('limit', current_app.config.get('SYNC_PAGE_LIMIT', 500), type=int),
+            current_app.config.get('SYNC_PAGE_LIMIT', 500)
+        ))
+        # Rows written in the last few seconds may belong to transactions that
+        # have not committed yet; leave them for the next pull so none are skipped.
+        settled_before = datetime.utcnow() - timedelta(
+            seconds=current_app.config.get('SYNC_SETTLE_SECONDS', 5)
+        )
+
+        changes = {}
+        has_more = False
+        for entity, model in SYNCED_MODELS.items():
+            query = scoped_query(entity, user).filter(model.updated_at < settled_before)
+            mark = marks.get(entity)
+            if mark:
+                try:
+                    mark_key = (datetime.fromisoformat(mark[0]), int(mark[1]))
+                except (TypeError, ValueError, IndexError, KeyError):
+                    raise SyncError(f'Invalid sync token for {entity}')
+                query = query.filter(tuple_(model.updated_at, model.id) > mark_key)
+
+            rows = query.order_by(model.updated_at, model.id).limit(limit + 1).all()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                has_more = True
+            if rows:
+                marks[entity] = [rows[-1].updated_at.isoformat(), rows[-1].id]
+            changes[entity] = [row.to_dict() for row in rows]
+
+        # Tombstones settle and page on (deleted_at, id) like live rows, since
+        # IDs are handed out before the deleting transactions commit
+        query = Tombstone.query.filter(
+            Tombstone.deleted_at < settled_before,
+            Tombstone.entity.in_(SYNCED_MODELS),
+            tombstone_scope(user)
+        )
+        mark = marks.get('tombstones')
+        if isinstance(mark, int):
+            # Tokens issued before tombstones were keyed on deleted_at
+            query = query.filter(Tombstone.id > mark)
+        elif mark:
+            try:
+                mark_key = (datetime.fromisoformat(mark[0]), int(mark[1]))
+            except (TypeError, ValueError, IndexError, KeyError):
+                raise SyncError('Invalid sync token for tombstones')
+            query = query.filter(tuple_(Tombstone.deleted_at, Tombstone.id) > mark_key)
+
+        tombstones = query.order_by(Tombstone.deleted_at, Tombstone.id).limit(limit + 1).all()
+        if len(tombstones) > limit:
+            tombstones = tombstones[:limit]
+            has_more = True
+        if tombstones:
+            marks['tombstones'] = [tombstones[-1].deleted_at.isoformat(), tombstones[-1].id]
+
+        deleted = {}
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+
+        return jsonify({
+            'changes': changes,
+            'deleted': deleted,
+            'next_token': encode_sync_token(marks),
+            'has_more': has_more
+        }), 200
+    except SyncError:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in pull_changes: {str(e)}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+@sync_bp.route('', methods=['POST'])
+@jwt_required
+def push_changes():
+    """Apply a batch of client-side performance log changes idempotently."""
+    try:
+        user = get_current_user()
+        data = request.get_json()
+        if not isinstance(data, dict) or not isinstance(data.get('changes'), list):
+            raise SyncError('A list of changes is required')
+
+        changes = data['changes']
+        if len(changes) > current_app.config.get('SYNC_PAGE_LIMIT', 500):
+            raise SyncError('Too many changes in one batch')
+
+        keys = [change.get('idempotency_key') for change in changes if isinstance(change, dict)]
+        if len(keys) != len(changes) or not all(keys):
+            raise SyncError('Every change needs an idempotency_key')
+        if not all(isinstance(change.get('data') or {}, dict) for change in changes):
+            raise SyncError('Change data must be an object')
+
+        # Look up already-applied keys and referenced rows with one query each
+        applied = dict(
+            db.session.query(SyncReceipt.idempotency_key, SyncReceipt.entity_id).filter(
+                SyncReceipt.user_id == user.id,
+                SyncReceipt.idempotency_key.in_(keys)
+            ).all()
+        )
+        log_ids = [change['id'] for change in changes if change.get('id')]
+        logs = {
+            log.id: log for log in PerformanceLog.query.filter(
+                PerformanceLog.id.in_(log_ids),
+                PerformanceLog.athlete_id == user.id
+            ).all()
+        } if log_ids else {}
+        workout_exercise_ids = {
+            (change.get('data') or {}).get('workout_exercise_id') for change in changes
+        }
+        known_workout_exercises = {
+            row.id for row in db.session.query(WorkoutExercise.id).filter(
+                WorkoutExercise.id.in_([i for i in workout_exercise_ids if i])
+            ).all()
+        }
+
+        results = []
+        receipts = []
+        seen = set()
+        for change in changes:
+            key = change['idempotency_key']
+            if key in applied:
+                results.append({'idempotency_key': key, 'status': 'duplicate', 'id': applied[key]})
+                continue
+            if key in seen:
+                results.append({'idempotency_key': key, 'status': 'rejected',
+                                'error': 'Duplicate idempotency_key in batch'})
+                continue
+            seen.add(key)
+
+            op = change.get('op')
+            if change.get('entity') != 'performance_logs' or op not in ('create', 'update', 'delete'):
+                results.append({'idempotency_key': key, 'status': 'rejected',
+                                'error': 'Unsupported entity or operation'})
+                continue
+
+            fields = change.get('data') or {}
+            if fields.get('workout_exercise_id') and fields['workout_exercise_id'] not in known_workout_exercises:
+                results.append({'idempotency_key': key, 'status': 'rejected',
+                                'error': 'Unknown workout exercise'})
+                continue
+
+            if op == 'create':
+                missing = [f for f in ('workout_exercise_id', 'set_number') if f not in fields]
+                if missing:
+                    results.append({'idempotency_key': key, 'status': 'rejected',
+                                    'error': f"Missing fields: {', '.join(missing)}"})
+                    continue
+                log = PerformanceLog(athlete_id=user.id)
+                db.session.add(log)
+            else:
+                log = logs.get(change.get('id'))
+                if not log:
+                    results.append({'idempotency_key': key, 'status': 'rejected',
+                                    'error': 'Performance log not found'})
+                    continue
+
+            if op == 'delete':
+                db.session.delete(log)
+            else:
+                for field in ('workout_exercise_id', 'set_number', 'weight', 'reps', 'rpe', 'notes'):
+                    if field in fields:
+                        setattr(log, field, fields[field])
+                if fields.get('logged_at'):
+                    log.logged_at = datetime.fromisoformat(fields['logged_at'])
+
+            results.append({'idempotency_key': key, 'status': 'applied', 'log': log})
+            receipts.append((key, log))
+
+        # One flush assigns IDs for every created log before receipts are written
+        db.session.flush()
+        for result in results:
+            log = result.pop('log', None)
+            if log is not None:
+                result['id'] = log.id
+        db.session.add_all([
+            SyncReceipt(user_id=user.id, idempotency_key=key,
+                        entity='performance_logs', entity_id=log.id)
+            for key, log in receipts
+        ])
+        db.session.commit()
+
+        return jsonify({'results': results}), 200
+    except SyncError:
+        db.session.rollback()
+        raise
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Invalid change: {str(e)}'}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        logger.error(f"Integrity error in push_changes: {str(e)}")
+        return jsonify({'error': 'Database integrity error'}), 409
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error in push_changes: {str(e)}")
+        return jsonify({'error': 'Database error occurred'}), 500
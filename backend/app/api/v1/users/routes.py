@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from app.models import User
 from app.database import db
 from app.utils.auth import jwt_required, coach_required
+from app.utils.pagination import paginate
+from app.utils.serializers import user_serializer
 from sqlalchemy.exc import SQLAlchemyError
 
 users_bp = Blueprint('users', __name__)
@@ -9,12 +11,16 @@ users_bp = Blueprint('users', __name__)
 @users_bp.route('', methods=['GET'])
 @jwt_required
 def get_users():
-    """Get all users."""
+    """Get users, paginated by ID."""
     try:
-        users = User.query.all()
+        fields = user_serializer.parse_fields()
+        users, next_cursor = paginate(user_serializer.apply(User.query, fields), [User.id])
         return jsonify({
-            'users': [user.to_dict() for user in users]
+            'users': user_serializer.dump_all(users, fields),
+            'next_cursor': next_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except SQLAlchemyError as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,10 +1,19 @@
-from flask import Blueprint, request, jsonify
-from app.models import Workout, Exercise, WorkoutExercise, PerformanceLog, FormAnalysis
+from flask import Blueprint, request, jsonify, current_app
+from app.models import (
+    Workout, Exercise, WorkoutExercise, PerformanceLog, FormAnalysis, PersonalRecord, AthleteProgram
+)
+from app.models.workout import EDITABLE_FIELDS, StaleWorkoutError
+from app.models.workout_exercise import UPDATABLE_FIELDS
 from app.database import db
-from app.utils.auth import jwt_required, coach_required
+from app.utils.auth import jwt_required, coach_required, get_current_user
+from app.utils.pagination import paginate
+from app.utils.serializers import workout_serializer
+from app.utils.catalog import get_catalog
+from app.utils.etags import workout_etag, not_modified, with_etag
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from datetime import datetime
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -52,11 +61,21 @@ def get_workouts():
             except ValueError:
                 raise WorkoutError('Invalid date_to format. Use YYYY-MM-DD')
         
-        workouts = query.all()
+        try:
+            fields = workout_serializer.parse_fields()
+            workouts, next_cursor = paginate(
+                workout_serializer.apply(query, fields), [Workout.id], descending=True
+            )
+        except ValueError as e:
+            raise WorkoutError(str(e))
+
         return jsonify({
-            'workouts': [workout.to_dict() for workout in workouts],
-            'count': len(workouts)
+            'workouts': workout_serializer.dump_all(workouts, fields),
+            'count': len(workouts),
+            'next_cursor': next_cursor
         }), 200
+    except WorkoutError:
+        raise
     except SQLAlchemyError as e:
         logger.error(f"Database error in get_workouts: {str(e)}")
         return jsonify({'error': 'Database error occurred'}), 500
@@ -72,11 +91,19 @@ def get_workout(workout_id):
         return jsonify({}), 200
         
     try:
+        # Versions are checked before the workout and its exercises are loaded
+        etag = workout_etag(workout_id)
+        if etag is None:
+            raise WorkoutError(f'Workout with id {workout_id} not found', 404)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
         workout = Workout.query.get(workout_id)
         if not workout:
             raise WorkoutError(f'Workout with id {workout_id} not found', 404)
             
-        return jsonify(workout.to_dict()), 200
+        return with_etag(jsonify(workout.to_dict()), etag), 200
     except WorkoutError as e:
         raise
     except SQLAlchemyError as e:
@@ -86,6 +113,91 @@ def get_workout(workout_id):
         logger.error(f"Unexpected error in get_workout: {str(e)}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
+@workouts_bp.route('/<int:workout_id>', methods=['PATCH'])
+@coach_required
+def edit_workout(workout_id):
+    """Apply a batch of workout and exercise edits in one transaction.
+
+    Expects the workout version the client last read; if another edit
+    landed in the meantime the whole batch is rejected with 409 and the
+    current version.
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('version'), int):
+            raise WorkoutError("The workout version being edited is required")
+
+        changes = data.get('exercises') or {}
+        updates = changes.get('update') or []
+        inserts = changes.get('insert') or []
+        deletes = changes.get('delete') or []
+        if not all(isinstance(items, list) for items in (updates, inserts, deletes)):
+            raise WorkoutError("Exercise update, insert and delete must be lists")
+
+        max_changes = current_app.config.get('WORKOUT_EDIT_MAX_CHANGES', 500)
+        if len(updates) + len(inserts) + len(deletes) > max_changes:
+            raise WorkoutError(f"At most {max_changes} exercise changes can be applied per request")
+
+        if not all(isinstance(exercise_id, int) for exercise_id in deletes):
+            raise WorkoutError("Exercises to delete must be given by ID")
+        for i, item in enumerate(updates):
+            if not isinstance(item, dict) or not isinstance(item.get('id'), int):
+                raise WorkoutError(f"Update {i} must be an object with an exercise id")
+            unknown = set(item) - {'id', *UPDATABLE_FIELDS}
+            if unknown:
+                raise WorkoutError(f"Update {i} has fields that cannot be changed: {', '.join(sorted(unknown))}")
+            if 'sets' in item and item['sets'] is None:
+                raise WorkoutError(f"Update {i} cannot clear sets")
+        updated_ids = [item['id'] for item in updates]
+        if len(set(updated_ids)) != len(updated_ids) or set(updated_ids) & set(deletes):
+            raise WorkoutError("Each exercise can only be changed once per edit")
+
+        catalog = get_catalog()
+        for i, item in enumerate(inserts):
+            if not isinstance(item, dict) or 'exercise_id' not in item or 'sets' not in item:
+                raise WorkoutError(f"Insert {i} requires exercise_id and sets")
+            if item['exercise_id'] not in catalog:
+                raise WorkoutError(f"Exercise with id {item['exercise_id']} not found")
+
+        workout = Workout.query.get(workout_id)
+        if not workout:
+            raise WorkoutError(f'Workout with id {workout_id} not found', 404)
+        if workout.program is None or workout.program.coach_id != get_current_user().id:
+            raise WorkoutError('Not authorized to modify this workout', 403)
+
+        try:
+            result = workout.apply_edit(
+                data['version'],
+                fields={name: data[name] for name in EDITABLE_FIELDS if name in data},
+                updates=updates,
+                inserts=inserts,
+                deletes=deletes
+            )
+        except StaleWorkoutError as e:
+            return jsonify({
+                'error': 'Workout was modified by another edit',
+                'current_version': e.current_version
+            }), 409
+        except ValueError as e:
+            raise WorkoutError(str(e))
+
+        return jsonify({
+            'version': result['version'],
+            'created': result['created'],
+            'workout': workout.to_dict()
+        }), 200
+    except WorkoutError:
+        raise
+    except IntegrityError as e:
+        logger.error(f"Integrity error in edit_workout: {str(e)}")
+        return jsonify({'error': 'Database integrity error'}), 400
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in edit_workout: {str(e)}")
+        return jsonify({'error': 'Database error occurred'}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in edit_workout: {str(e)}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
 @workouts_bp.route('/exercise/<int:exercise_id>', methods=['GET', 'OPTIONS'])
 @jwt_required
 def get_exercise_workouts(exercise_id):
@@ -112,26 +224,15 @@ def get_exercise_workouts(exercise_id):
 @workouts_bp.route('/exercise/<int:exercise_id>/records', methods=['GET', 'OPTIONS'])
 @jwt_required
 def get_exercise_records(exercise_id):
-    """Get personal records for a specific exercise."""
+    """Get the current athlete's personal records for a specific exercise."""
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
     try:
-        # Get the exercise to ensure it exists
-        exercise = Exercise.query.get(exercise_id)
-        if not exercise:
+        if exercise_id not in get_catalog():
             return jsonify({'error': f'Exercise with id {exercise_id} not found'}), 404
 
-        # Get all workouts for this exercise
-        workout_exercises = WorkoutExercise.query.filter_by(exercise_id=exercise_id).all()
-        
-        # Calculate records
-        records = {
-            'max_weight': max([we.weight for we in workout_exercises if we.weight is not None], default=0),
-            'max_reps': max([we.reps for we in workout_exercises if we.reps is not None], default=0),
-            'total_sets': len(workout_exercises)
-        }
-        
+        records = PersonalRecord.get_for_exercise(get_current_user().id, exercise_id)
         return jsonify(records), 200
         
     except SQLAlchemyError as e:
@@ -193,6 +294,117 @@ def log_exercise_set(exercise_id):
         logger.error(f"Unexpected error in log_exercise_set: {str(e)}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
+# Bounds of the performance_logs columns: integer, Numeric(10, 2) and Numeric(3, 1)
+MAX_INTEGER = 2 ** 31 - 1
+MAX_WEIGHT = 99999999.99
+MAX_RPE = 10
+
+def _check_number(i, name, value, minimum, maximum, integer=False):
+    """Raise a WorkoutError unless value is None or a number within bounds."""
+    if value is None:
+        return
+    kinds = (int,) if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kinds) or not math.isfinite(value):
+        raise WorkoutError(f"Set {i} has an invalid {name}")
+    if not minimum <= value <= maximum:
+        raise WorkoutError(f"Set {i} has {name} out of range ({minimum} to {maximum})")
+
+@workouts_bp.route('/<int:workout_id>/sets', methods=['POST', 'OPTIONS'])
+@jwt_required
+def log_workout_sets(workout_id):
+    """Log every set of a workout session in a single request and transaction."""
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('sets'), list) or not data['sets']:
+            raise WorkoutError("A non-empty list of sets is required")
+
+        max_sets = current_app.config.get('BULK_SET_LOG_MAX_SETS', 500)
+        if len(data['sets']) > max_sets:
+            raise WorkoutError(f"At most {max_sets} sets can be logged per request")
+
+        # Resolve every referenced workout exercise with one query
+        exercise_ids = dict(
+            db.session.query(WorkoutExercise.id, WorkoutExercise.exercise_id).filter(
+                WorkoutExercise.workout_id == workout_id
+            ).all()
+        )
+        if not exercise_ids:
+            raise WorkoutError(f'Workout with id {workout_id} not found', 404)
+
+        user = get_current_user()
+        assigned = db.session.query(Workout.id).join(
+            AthleteProgram, AthleteProgram.program_id == Workout.program_id
+        ).filter(
+            Workout.id == workout_id,
+            AthleteProgram.athlete_id == user.id
+        ).first()
+        if not assigned:
+            raise WorkoutError('Workout is not part of a program assigned to you', 403)
+
+        sets = []
+        required_fields = ['workout_exercise_id', 'set_number', 'weight', 'reps']
+        for i, set_data in enumerate(data['sets']):
+            if not isinstance(set_data, dict):
+                raise WorkoutError(f"Set {i} must be an object")
+            missing_fields = [field for field in required_fields if field not in set_data]
+            if missing_fields:
+                raise WorkoutError(f"Set {i} is missing required fields: {', '.join(missing_fields)}")
+            if set_data['workout_exercise_id'] not in exercise_ids:
+                raise WorkoutError(
+                    f"Set {i} references workout exercise {set_data['workout_exercise_id']} "
+                    f"which is not part of workout {workout_id}"
+                )
+            if set_data['set_number'] is None:
+                raise WorkoutError(f"Set {i} has an invalid set_number")
+            _check_number(i, 'set_number', set_data['set_number'], 1, MAX_INTEGER, integer=True)
+            _check_number(i, 'reps', set_data['reps'], 0, MAX_INTEGER, integer=True)
+            _check_number(i, 'weight', set_data['weight'], 0, MAX_WEIGHT)
+            _check_number(i, 'rpe', set_data.get('rpe'), 0, MAX_RPE)
+
+            logged_at = set_data.get('logged_at')
+            if logged_at:
+                try:
+                    logged_at = datetime.fromisoformat(logged_at)
+                except (TypeError, ValueError):
+                    raise WorkoutError(f"Set {i} has an invalid logged_at timestamp")
+
+            sets.append({
+                'workout_exercise_id': set_data['workout_exercise_id'],
+                'exercise_id': exercise_ids[set_data['workout_exercise_id']],
+                'set_number': set_data['set_number'],
+                'weight': set_data['weight'],
+                'reps': set_data['reps'],
+                'rpe': set_data.get('rpe'),
+                'notes': set_data.get('notes'),
+                'video_url': set_data.get('video_url'),
+                'pose_data': set_data.get('pose_data'),
+                'form_score': set_data.get('form_score'),
+                'logged_at': logged_at
+            })
+
+        log_ids = PerformanceLog.bulk_create(user.id, sets)
+
+        return jsonify({
+            'message': 'Sets logged successfully',
+            'ids': log_ids,
+            'count': len(log_ids)
+        }), 201
+
+    except WorkoutError:
+        raise
+    except IntegrityError as e:
+        logger.error(f"Integrity error in log_workout_sets: {str(e)}")
+        return jsonify({'error': 'Database integrity error'}), 400
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in log_workout_sets: {str(e)}")
+        return jsonify({'error': 'Database error occurred'}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in log_workout_sets: {str(e)}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
 @workouts_bp.route('', methods=['POST', 'OPTIONS'])
 @coach_required
 def create_workout():
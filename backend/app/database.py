@@ -1,5 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
+class RoutingSession(Session):
+    """Session that sends reads from read-only routes to a healthy replica.
+
+    Flushes, DML, locking reads and everything outside the configured
+    read-only blueprints use the primary bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            from app.utils.db_routing import replica_router, replica_allowed, is_read_statement
+            if is_read_statement(clause) and replica_allowed():
+                engine = replica_router.choose(self._db.engines)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
@@ -5,7 +5,11 @@ from .workout import Workout
 from .workout_exercise import WorkoutExercise
 from .athlete_program import AthleteProgram
 from .performance_log import PerformanceLog
+from .performance_log_pose import PerformanceLogPose
 from .form_analysis import FormAnalysis
+from .tombstone import Tombstone
+from .sync_receipt import SyncReceipt
+from .personal_record import PersonalRecord
 
 __all__ = [
     'User',
@@ -15,5 +19,9 @@ __all__ = [
     'WorkoutExercise',
     'AthleteProgram',
     'PerformanceLog',
+    'PerformanceLogPose',
     'FormAnalysis',
+    'Tombstone',
+    'SyncReceipt',
+    'PersonalRecord',
 ]
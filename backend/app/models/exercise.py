@@ -1,10 +1,23 @@
+import re
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from app import db
 from .base import BaseModel
 
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
 class Exercise(BaseModel):
     """Exercise model for individual exercises."""
     
     __tablename__ = 'exercises'
+    __table_args__ = (
+        db.Index('ix_exercises_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_exercises_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_exercises_muscles_worked', 'muscles_worked', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -12,6 +25,11 @@ class Exercise(BaseModel):
                             name='exercise_type'), nullable=False)
     description = db.Column(db.Text)
     video_url = db.Column(db.String(255))
+    muscles_worked = db.Column(ARRAY(db.String(50)), nullable=False, default=list,
+                               server_default='{}')
+    search_vector = db.deferred(db.Column(
+        TSVECTOR, db.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)
+    ))
 
     # Relationships
     workout_exercises = db.relationship('WorkoutExercise', back_populates='exercise', lazy='dynamic',
@@ -24,15 +42,51 @@ class Exercise(BaseModel):
         return cls.query.filter_by(type=exercise_type).all()
 
     @classmethod
-    def search(cls, query):
-        """Search exercises by name or description."""
-        search = f"%{query}%"
-        return cls.query.filter(
-            db.or_(
-                cls.name.ilike(search),
-                cls.description.ilike(search)
+    def search(cls, query, exercise_type=None, muscle=None, prefix=False, limit=None):
+        """Search exercises by name or description, best matches first.
+
+        Full mode matches the weighted name/description tsvector and falls back
+        to trigram similarity on the name, so typos still match. Prefix mode is
+        meant for typeahead: it matches name prefixes and prefix tsquery terms.
+        Both are served by GIN indexes rather than a sequential ILIKE scan.
+
+        Args:
+            query (str): Text typed by the user
+            exercise_type (str, optional): Restrict to one exercise type
+            muscle (str, optional): Restrict to exercises working this muscle
+            prefix (bool, optional): Use typeahead prefix matching
+            limit (int, optional): Maximum number of results
+        """
+        results = cls.query
+        terms = re.findall(r'\w+', query or '')
+
+        if terms and prefix:
+            tsquery = db.func.to_tsquery('english', ' & '.join(f'{term}:*' for term in terms))
+            pattern = query.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            results = results.filter(
+                db.or_(cls.name.ilike(pattern), cls.search_vector.op('@@')(tsquery))
+            ).order_by(
+                db.func.similarity(cls.name, query).desc(),
+                cls.name
             )
-        ).all()
+        elif terms:
+            tsquery = db.func.websearch_to_tsquery('english', query)
+            rank = (db.func.ts_rank_cd(cls.search_vector, tsquery)
+                    + db.func.similarity(cls.name, query))
+            results = results.filter(
+                db.or_(cls.search_vector.op('@@')(tsquery), cls.name.op('%')(query))
+            ).order_by(rank.desc(), cls.id)
+        else:
+            results = results.order_by(cls.name)
+
+        if exercise_type:
+            results = results.filter(cls.type == exercise_type)
+        if muscle:
+            results = results.filter(cls.muscles_worked.contains([muscle.lower()]))
+        if limit is not None:
+            results = results.limit(limit)
+
+        return results.all()
 
     def get_performance_history(self, athlete_id):
         """Get performance history for this exercise by a specific athlete."""
@@ -54,6 +108,7 @@ class Exercise(BaseModel):
             'type': self.type,
             'description': self.description,
             'video_url': self.video_url,
+            'muscles_worked': list(self.muscles_worked or []),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
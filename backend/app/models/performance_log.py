@@ -1,5 +1,6 @@
 from app import db
 from .base import BaseModel
+from .performance_log_pose import PerformanceLogPose
 from datetime import datetime
 
 class PerformanceLog(BaseModel):
@@ -17,11 +18,38 @@ class PerformanceLog(BaseModel):
     video_url = db.Column(db.String(255))
     notes = db.Column(db.Text)
     logged_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
-    pose_data = db.Column(db.JSON)  # Store pose data as JSON
     form_score = db.Column(db.Float)
 
     # Relationships
     form_analyses = db.relationship('FormAnalysis', back_populates='performance_log', cascade='all, delete-orphan')
+    # Pose payloads live in performance_log_poses and are only loaded on access.
+    # Deletes are handled by the flush hook in performance_log_pose, so the ORM
+    # never loads a payload just to remove it.
+    pose = db.relationship(
+        'PerformanceLogPose',
+        primaryjoin='PerformanceLog.id == foreign(PerformanceLogPose.performance_log_id)',
+        uselist=False,
+        lazy='select',
+        cascade='save-update, merge',
+        passive_deletes='all'
+    )
+
+    @property
+    def pose_data(self):
+        """Pose data for this set, loaded from performance_log_poses on first access."""
+        return self.pose.pose_data if self.pose else None
+
+    @pose_data.setter
+    def pose_data(self, value):
+        if self.pose is not None:
+            if value is None:
+                db.session.delete(self.pose)
+                self.pose = None
+            else:
+                self.pose.pose_data = value
+        elif value is not None:
+            # Read without triggering a refresh of the server-side default
+            self.pose = PerformanceLogPose(pose_data=value, logged_at=self.__dict__.get('logged_at'))
 
     @classmethod
     def get_athlete_history(cls, athlete_id, exercise_id=None, days=30):
@@ -76,6 +104,95 @@ class PerformanceLog(BaseModel):
             'total_sets': stats.total_sets
         }
 
+    @classmethod
+    def bulk_create(cls, athlete_id, sets):
+        """Insert many sets for an athlete in a single transaction.
+
+        Logs are written with one multi-row INSERT ... RETURNING; pose
+        payloads and form analyses for sets that carry both a video and pose
+        data are written with further multi-row INSERTs before the single
+        commit.
+
+        Args:
+            athlete_id (int): ID of the athlete logging the sets
+            sets (list): Validated set dicts with workout_exercise_id, exercise_id,
+                set_number, weight, reps and optional rpe, notes, video_url,
+                pose_data, form_score and logged_at
+
+        Returns:
+            list: IDs of the created performance logs, in input order
+        """
+        from sqlalchemy import insert
+        from .form_analysis import FormAnalysis
+        from .personal_record import PersonalRecord
+        from app.utils.analytics import mark_history_changed
+
+        log_rows = []
+        for item in sets:
+            row = {
+                'athlete_id': athlete_id,
+                'workout_exercise_id': item['workout_exercise_id'],
+                'set_number': item['set_number'],
+                'weight': item['weight'],
+                'reps': item['reps'],
+                'rpe': item.get('rpe'),
+                'notes': item.get('notes'),
+                'video_url': item.get('video_url'),
+                'form_score': item.get('form_score')
+            }
+            if item.get('logged_at'):
+                row['logged_at'] = item['logged_at']
+            log_rows.append(row)
+
+        try:
+            result = db.session.execute(
+                insert(cls).returning(cls.id, cls.logged_at, sort_by_parameter_order=True),
+                log_rows
+            )
+            inserted = result.all()
+            log_ids = [row.id for row in inserted]
+
+            pose_rows = [
+                {
+                    'performance_log_id': row.id,
+                    'logged_at': row.logged_at,
+                    'pose_data': item['pose_data']
+                }
+                for row, item in zip(inserted, sets)
+                if item.get('pose_data')
+            ]
+            if pose_rows:
+                db.session.execute(insert(PerformanceLogPose), pose_rows)
+
+            analysis_rows = [
+                {
+                    'performance_log_id': log_id,
+                    'athlete_id': athlete_id,
+                    'exercise_id': item['exercise_id'],
+                    'video_url': item['video_url'],
+                    'pose_data': item['pose_data'],
+                    'form_score': item.get('form_score') or 0
+                }
+                for log_id, item in zip(log_ids, sets)
+                if item.get('video_url') and item.get('pose_data')
+            ]
+            if analysis_rows:
+                db.session.execute(insert(FormAnalysis), analysis_rows)
+
+            # Core inserts bypass the ORM flush hooks, so apply records here
+            PersonalRecord.record_sets(db.session, [
+                dict(item, id=row.id, athlete_id=athlete_id, logged_at=row.logged_at)
+                for row, item in zip(inserted, sets)
+            ])
+            mark_history_changed(db.session, athlete_id)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return log_ids
+
     def calculate_volume(self):
         """Calculate volume (weight * reps) for this set."""
         return float(self.weight) * self.reps if self.weight and self.reps else 0
@@ -84,14 +201,21 @@ class PerformanceLog(BaseModel):
         """Calculate intensity percentage based on one rep max."""
         return (float(self.weight) / one_rep_max * 100) if self.weight and one_rep_max else 0
 
-    def to_dict(self, include_exercise=False):
-        """Convert performance log instance to dictionary."""
+    def to_dict(self, include_exercise=False, include_pose=False):
+        """Convert performance log instance to dictionary.
+
+        Pose data is left out unless include_pose is set, since it costs an
+        extra query and can be several megabytes per set.
+        """
         data = super().to_dict()
         data['volume'] = self.calculate_volume()
-        data['pose_data'] = self.pose_data
-        data['form_score'] = self.form_score
+        
+        if include_pose:
+            data['pose_data'] = self.pose_data
         
         if include_exercise:
-            data['exercise'] = self.workout_exercise.exercise.to_dict()
+            from app.utils.catalog import get_catalog
+            exercise_id = self.workout_exercise.exercise_id
+            data['exercise'] = get_catalog().get(exercise_id) or self.workout_exercise.exercise.to_dict()
             
         return data
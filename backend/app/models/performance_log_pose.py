@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import db
+
+class PerformanceLogPose(db.Model):
+    """Pose estimation payload for one performance log.
+
+    Kept out of performance_logs so the hypertable rows stay narrow and
+    compress well; payloads are only read when a client asks for them.
+    Partitioned by logged_at like the logs themselves, so old payloads can
+    be compressed and dropped chunk by chunk.
+    """
+
+    __tablename__ = 'performance_log_poses'
+
+    performance_log_id = db.Column(db.Integer, primary_key=True)
+    logged_at = db.Column(db.DateTime, primary_key=True, default=db.func.current_timestamp())
+    pose_data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def get_for_log(cls, performance_log_id):
+        """Get the pose payload stored for a performance log, if any."""
+        return db.session.query(cls.pose_data).filter(
+            cls.performance_log_id == performance_log_id
+        ).scalar()
+
+    @classmethod
+    def get_json_for_log(cls, performance_log_id):
+        """Get the stored pose payload as JSON text, without decoding it."""
+        return db.session.query(db.cast(cls.pose_data, db.Text)).filter(
+            cls.performance_log_id == performance_log_id
+        ).scalar()
+
+
+@event.listens_for(Session, 'after_flush')
+def delete_orphaned_poses(session, flush_context):
+    """Remove the pose payloads of performance logs deleted in this flush."""
+    from .performance_log import PerformanceLog
+
+    log_ids = [obj.id for obj in session.deleted if isinstance(obj, PerformanceLog)]
+    if log_ids:
+        session.connection().execute(
+            PerformanceLogPose.__table__.delete().where(
+                PerformanceLogPose.performance_log_id.in_(log_ids)
+            )
+        )
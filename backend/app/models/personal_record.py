@@ -0,0 +1,271 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.database import db
+from .base import BaseModel
+
+def estimate_one_rep_max(weight, reps):
+    """Estimate a one rep max with the Epley formula."""
+    if not weight or not reps:
+        return 0
+    weight = float(weight)
+    return weight if reps == 1 else weight * (1 + reps / 30.0)
+
+# Full recompute of records from performance_logs, used by backfill and rebuilds.
+# {where} restricts the source sets to the athletes/exercises being recomputed.
+# Records marked archived came from sets moved to cold storage; they are only
+# ever replaced by a better set, since their source is no longer here.
+REBUILD_SQL = """
+WITH sets AS (
+    SELECT pl.id, pl.athlete_id, we.exercise_id, pl.weight, pl.reps, pl.logged_at
+    FROM performance_logs pl
+    JOIN workout_exercises we ON we.id = pl.workout_exercise_id
+    WHERE pl.weight IS NOT NULL AND pl.reps > 0 {where}
+),
+best_weight AS (
+    SELECT DISTINCT ON (athlete_id, exercise_id, reps)
+        athlete_id, exercise_id, 'weight' AS record_type, reps, weight AS value, id, logged_at
+    FROM sets
+    ORDER BY athlete_id, exercise_id, reps, weight DESC, logged_at
+),
+best_e1rm AS (
+    SELECT DISTINCT ON (athlete_id, exercise_id)
+        athlete_id, exercise_id, 'e1rm' AS record_type, 0 AS reps,
+        CASE WHEN reps = 1 THEN weight ELSE weight * (1 + reps / 30.0) END AS value, id, logged_at
+    FROM sets
+    ORDER BY athlete_id, exercise_id,
+        CASE WHEN reps = 1 THEN weight ELSE weight * (1 + reps / 30.0) END DESC, logged_at
+),
+best_volume AS (
+    SELECT DISTINCT ON (athlete_id, exercise_id)
+        athlete_id, exercise_id, 'volume' AS record_type, 0 AS reps, weight * reps AS value, id, logged_at
+    FROM sets
+    ORDER BY athlete_id, exercise_id, weight * reps DESC, logged_at
+)
+INSERT INTO personal_records (
+    athlete_id, exercise_id, record_type, reps, value,
+    performance_log_id, achieved_at, created_at, updated_at
+)
+SELECT athlete_id, exercise_id, record_type, reps, value, id, logged_at, now(), now()
+FROM (
+    SELECT * FROM best_weight
+    UNION ALL SELECT * FROM best_e1rm
+    UNION ALL SELECT * FROM best_volume
+) records
+ON CONFLICT (athlete_id, exercise_id, record_type, reps) DO UPDATE SET
+    value = EXCLUDED.value,
+    performance_log_id = EXCLUDED.performance_log_id,
+    achieved_at = EXCLUDED.achieved_at,
+    archived = false,
+    updated_at = now()
+WHERE personal_records.value < EXCLUDED.value OR NOT personal_records.archived
+"""
+
+class PersonalRecord(BaseModel):
+    """Best lifts per athlete and exercise, maintained as logs are written.
+
+    One row per (athlete, exercise, record_type, reps): 'weight' rows hold the
+    heaviest set at each rep count, 'e1rm' and 'volume' rows (reps = 0) hold
+    the best estimated one rep max and the best single-set volume.
+    """
+
+    __tablename__ = 'personal_records'
+    __table_args__ = (
+        db.UniqueConstraint('athlete_id', 'exercise_id', 'record_type', 'reps',
+                            name='uq_personal_records_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=False)
+    record_type = db.Column(db.String(20), nullable=False)
+    reps = db.Column(db.Integer, nullable=False, default=0)
+    value = db.Column(db.Numeric(10, 2), nullable=False)
+    performance_log_id = db.Column(db.Integer)
+    achieved_at = db.Column(db.DateTime)
+    # Set by archive_before when the record's log moves to cold storage
+    archived = db.Column(db.Boolean, nullable=False, default=False, server_default='false')
+
+    @classmethod
+    def get_for_exercise(cls, athlete_id, exercise_id):
+        """Get an athlete's records for one exercise as a summary dictionary."""
+        records = cls.query.filter_by(athlete_id=athlete_id, exercise_id=exercise_id).all()
+
+        summary = {
+            'exercise_id': exercise_id,
+            'max_weight': 0,
+            'max_reps': 0,
+            'estimated_one_rep_max': None,
+            'best_volume': None,
+            'best_weight_by_reps': {}
+        }
+        for record in records:
+            entry = record.to_dict()
+            if record.record_type == 'weight':
+                summary['best_weight_by_reps'][record.reps] = entry
+                summary['max_weight'] = max(summary['max_weight'], entry['value'])
+                summary['max_reps'] = max(summary['max_reps'], record.reps)
+            elif record.record_type == 'e1rm':
+                summary['estimated_one_rep_max'] = entry
+            elif record.record_type == 'volume':
+                summary['best_volume'] = entry
+        return summary
+
+    @classmethod
+    def record_sets(cls, connection, sets):
+        """Incrementally apply newly logged sets to the records table.
+
+        Candidates are reduced to the best per record key first, then upserted
+        with a conditional ON CONFLICT so existing records only ever improve.
+
+        Args:
+            connection: Connection or session to execute on
+            sets (list): Dicts with id, athlete_id, exercise_id, weight, reps, logged_at
+        """
+        best = {}
+        for item in sets:
+            weight, reps = item.get('weight'), item.get('reps')
+            if weight is None or not reps or reps <= 0:
+                continue
+            weight = float(weight)
+            candidates = (
+                ('weight', reps, weight),
+                ('e1rm', 0, estimate_one_rep_max(weight, reps)),
+                ('volume', 0, weight * reps),
+            )
+            for record_type, record_reps, value in candidates:
+                key = (item['athlete_id'], item['exercise_id'], record_type, record_reps)
+                if key not in best or value > best[key]['value']:
+                    best[key] = {
+                        'athlete_id': item['athlete_id'],
+                        'exercise_id': item['exercise_id'],
+                        'record_type': record_type,
+                        'reps': record_reps,
+                        'value': round(value, 2),
+                        'performance_log_id': item['id'],
+                        'achieved_at': item.get('logged_at') or datetime.utcnow(),
+                        'created_at': datetime.utcnow(),
+                        'updated_at': datetime.utcnow()
+                    }
+
+        if not best:
+            return
+
+        stmt = pg_insert(cls.__table__).values(list(best.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_personal_records_key',
+            set_={
+                'value': stmt.excluded.value,
+                'performance_log_id': stmt.excluded.performance_log_id,
+                'achieved_at': stmt.excluded.achieved_at,
+                'archived': False,
+                'updated_at': stmt.excluded.updated_at
+            },
+            where=cls.__table__.c.value < stmt.excluded.value
+        )
+        connection.execute(stmt)
+
+    @classmethod
+    def rebuild(cls, connection, pairs):
+        """Recompute records for specific (athlete_id, exercise_id) pairs.
+
+        Used when logs are edited or deleted, since records cannot be
+        lowered incrementally. Records set by archived logs are kept.
+        """
+        for athlete_id, exercise_id in pairs:
+            params = {'athlete_id': athlete_id, 'exercise_id': exercise_id}
+            connection.execute(text(
+                "DELETE FROM personal_records "
+                "WHERE athlete_id = :athlete_id AND exercise_id = :exercise_id AND NOT archived"
+            ), params)
+            connection.execute(text(REBUILD_SQL.format(
+                where='AND pl.athlete_id = :athlete_id AND we.exercise_id = :exercise_id'
+            )), params)
+
+    @classmethod
+    def backfill(cls, athlete_ids=None):
+        """Recompute records from all performance logs in one set-based statement.
+
+        Args:
+            athlete_ids (list, optional): Restrict the backfill to these athletes
+        """
+        if athlete_ids:
+            statement = text(REBUILD_SQL.format(where='AND pl.athlete_id = ANY(:athlete_ids)'))
+            result = db.session.execute(statement, {'athlete_ids': list(athlete_ids)})
+        else:
+            result = db.session.execute(text(REBUILD_SQL.format(where='')))
+        db.session.commit()
+        return result.rowcount
+
+    def to_dict(self):
+        """Convert personal record instance to dictionary."""
+        return {
+            'record_type': self.record_type,
+            'reps': self.reps,
+            'value': float(self.value),
+            'performance_log_id': self.performance_log_id,
+            'achieved_at': self.achieved_at.isoformat() if self.achieved_at else None
+        }
+
+
+@event.listens_for(Session, 'after_flush')
+def update_personal_records(session, flush_context):
+    """Keep personal records in step with performance logs written through the ORM."""
+    from .performance_log import PerformanceLog
+    from .workout_exercise import WorkoutExercise
+
+    new_logs = [obj for obj in session.new if isinstance(obj, PerformanceLog)]
+    changed_logs = [
+        obj for obj in session.dirty
+        if isinstance(obj, PerformanceLog) and session.is_modified(obj)
+    ]
+    deleted_logs = [obj for obj in session.deleted if isinstance(obj, PerformanceLog)]
+    if not (new_logs or changed_logs or deleted_logs):
+        return
+
+    # A log moved to another exercise or athlete also changes the records it left
+    previous = []
+    for log in changed_logs:
+        attrs = inspect(log).attrs
+        old_athletes = attrs.athlete_id.history.deleted or [log.athlete_id]
+        old_workout_exercises = attrs.workout_exercise_id.history.deleted or [log.workout_exercise_id]
+        previous.extend(
+            (athlete_id, workout_exercise_id)
+            for athlete_id in old_athletes for workout_exercise_id in old_workout_exercises
+            if athlete_id is not None and workout_exercise_id is not None
+        )
+
+    connection = session.connection()
+    workout_exercise_ids = {
+        log.workout_exercise_id for log in (*new_logs, *changed_logs, *deleted_logs)
+    } | {workout_exercise_id for _, workout_exercise_id in previous}
+    exercise_ids = dict(connection.execute(
+        db.select(WorkoutExercise.id, WorkoutExercise.exercise_id).where(
+            WorkoutExercise.id.in_(workout_exercise_ids)
+        )
+    ).all())
+
+    PersonalRecord.record_sets(connection, [
+        {
+            'id': log.id,
+            'athlete_id': log.athlete_id,
+            'exercise_id': exercise_ids.get(log.workout_exercise_id),
+            'weight': log.weight,
+            'reps': log.reps,
+            # Read without triggering a refresh of the server-side default
+            'logged_at': log.__dict__.get('logged_at')
+        }
+        for log in new_logs if exercise_ids.get(log.workout_exercise_id)
+    ])
+
+    pairs = {
+        (athlete_id, exercise_ids[workout_exercise_id])
+        for athlete_id, workout_exercise_id in (
+            *((log.athlete_id, log.workout_exercise_id) for log in (*changed_logs, *deleted_logs)),
+            *previous
+        )
+        if workout_exercise_id in exercise_ids
+    }
+    if pairs:
+        PersonalRecord.rebuild(connection, pairs)
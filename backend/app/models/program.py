@@ -1,6 +1,47 @@
+from datetime import datetime
+from sqlalchemy import insert, literal, select, text
 from app import db
 from .base import BaseModel
 
+# Deep copy of a program, its workouts and their exercises in one statement.
+# New workout IDs are drawn from the sequence up front (the CTE is materialized
+# once), so exercises can be attached to their copied workout without a lookup.
+CLONE_SQL = """
+WITH new_program AS (
+    INSERT INTO programs (coach_id, name, description, created_at, updated_at)
+    SELECT :coach_id, COALESCE(:name, name || ' (copy)'), description, :now, :now
+    FROM programs
+    WHERE id = :program_id
+    RETURNING id
+),
+source_workouts AS MATERIALIZED (
+    SELECT w.*, nextval(pg_get_serial_sequence('workouts', 'id')) AS new_id
+    FROM workouts w
+    WHERE w.program_id = :program_id
+),
+new_workouts AS (
+    INSERT INTO workouts (id, program_id, name, description, day_number, notes, version, created_at, updated_at)
+    SELECT sw.new_id, np.id, sw.name, sw.description, sw.day_number, sw.notes, 1, :now, :now
+    FROM source_workouts sw CROSS JOIN new_program np
+    RETURNING id
+),
+new_exercises AS (
+    INSERT INTO workout_exercises (
+        workout_id, exercise_id, sets, reps, weight, set_type, rest_time, notes,
+        order_index, created_at, updated_at
+    )
+    SELECT sw.new_id, we.exercise_id, we.sets, we.reps, we.weight, we.set_type, we.rest_time,
+        we.notes, we.order_index, :now, :now
+    FROM workout_exercises we
+    JOIN source_workouts sw ON sw.id = we.workout_id
+    RETURNING id
+)
+SELECT
+    (SELECT id FROM new_program) AS program_id,
+    (SELECT count(*) FROM new_workouts) AS workout_count,
+    (SELECT count(*) FROM new_exercises) AS exercise_count
+"""
+
 class Program(BaseModel):
     """Program model for workout programs created by coaches."""
     
@@ -46,6 +87,84 @@ class Program(BaseModel):
         assignment.save()
         return assignment
 
+    def assign_to_athletes(self, athlete_ids, start_date, end_date=None):
+        """Assign this program to many athletes with one INSERT ... SELECT.
+
+        IDs that are not athletes, and athletes who already have this program
+        active, are skipped.
+
+        Returns:
+            list: (assignment_id, athlete_id) rows for the new assignments
+        """
+        from .athlete_program import AthleteProgram
+        from .user import User
+
+        now = datetime.utcnow()
+        already_assigned = select(AthleteProgram.id).where(
+            AthleteProgram.athlete_id == User.id,
+            AthleteProgram.program_id == self.id,
+            AthleteProgram.status == 'active'
+        ).exists()
+        athletes = select(
+            User.id,
+            literal(self.id),
+            literal(start_date, db.Date),
+            literal(end_date, db.Date),
+            literal('active'),
+            literal(now, db.DateTime),
+            literal(now, db.DateTime)
+        ).where(
+            User.id.in_(athlete_ids),
+            User.role == 'athlete',
+            ~already_assigned
+        )
+
+        table = AthleteProgram.__table__
+        try:
+            rows = db.session.execute(
+                insert(table).from_select(
+                    ['athlete_id', 'program_id', 'start_date', 'end_date', 'status',
+                     'created_at', 'updated_at'],
+                    athletes
+                ).returning(table.c.id, table.c.athlete_id)
+            ).all()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return [(row.id, row.athlete_id) for row in rows]
+
+    def clone(self, coach_id, name=None):
+        """Deep-copy this program with its workouts and workout exercises.
+
+        Runs as a single statement of data-modifying CTEs; assignments and
+        performance history are not copied.
+
+        Returns:
+            dict: 'program_id' of the copy and the number of workouts and
+                exercises copied, or None if the program no longer exists
+        """
+        try:
+            row = db.session.execute(text(CLONE_SQL), {
+                'program_id': self.id,
+                'coach_id': coach_id,
+                'name': name,
+                'now': datetime.utcnow()
+            }).one()
+            if row.program_id is None:
+                # Deleted since it was loaded; nothing was copied
+                db.session.rollback()
+                return None
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return {
+            'program_id': row.program_id,
+            'workout_count': row.workout_count,
+            'exercise_count': row.exercise_count
+        }
+
     def to_dict(self, include_workouts=False):
         """Convert program instance to dictionary."""
         data = super().to_dict()
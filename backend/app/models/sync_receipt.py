@@ -0,0 +1,16 @@
+from datetime import datetime
+from app.database import db
+
+class SyncReceipt(db.Model):
+    """Idempotency record for a client change applied through delta sync."""
+    __tablename__ = 'sync_receipts'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_sync_receipts_user_key'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    idempotency_key = db.Column(db.String(255), nullable=False)
+    entity = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
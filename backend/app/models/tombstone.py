@@ -0,0 +1,64 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import db
+
+class Tombstone(db.Model):
+    """Record of a deleted row, consumed by delta sync clients."""
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        db.Index('ix_tombstones_deleted_at_id', 'deleted_at', 'id'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    athlete_id = db.Column(db.Integer, index=True)  # Set for rows private to one athlete
+    program_id = db.Column(db.Integer, index=True)  # Set for roster rows, visible to the coach
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': self.id,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'deleted_at': self.deleted_at.isoformat()
+        }
+
+
+# Tables whose deletions are recorded, and the attribute scoping them to an athlete
+TOMBSTONED_TABLES = {
+    'exercises': None,
+    'programs': None,
+    'workouts': None,
+    'workout_exercises': None,
+    'athlete_programs': 'athlete_id',
+    'performance_logs': 'athlete_id',
+}
+
+# Tables whose deletions coaches also see, and the attribute naming the program
+TOMBSTONE_PROGRAM_SCOPES = {
+    'athlete_programs': 'program_id',
+}
+
+
+@event.listens_for(Session, 'after_flush')
+def record_tombstones(session, flush_context):
+    """Write a tombstone for every synced row deleted in this flush."""
+    rows = []
+    for obj in session.deleted:
+        table = getattr(obj, '__tablename__', None)
+        if table not in TOMBSTONED_TABLES:
+            continue
+        scope = TOMBSTONED_TABLES[table]
+        program_scope = TOMBSTONE_PROGRAM_SCOPES.get(table)
+        rows.append({
+            'entity': table,
+            'entity_id': obj.id,
+            'athlete_id': getattr(obj, scope) if scope else None,
+            'program_id': getattr(obj, program_scope) if program_scope else None,
+            'deleted_at': datetime.utcnow()
+        })
+    if rows:
+        session.connection().execute(Tombstone.__table__.insert(), rows)
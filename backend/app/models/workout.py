@@ -1,6 +1,18 @@
+from datetime import datetime
+from sqlalchemy import func, insert, select
 from app import db
 from .base import BaseModel
 
+# Workout columns a workout edit may change
+EDITABLE_FIELDS = ('name', 'description', 'day_number', 'notes')
+
+class StaleWorkoutError(Exception):
+    """Raised when a workout was edited since the client last read it."""
+
+    def __init__(self, current_version):
+        super().__init__('Workout was modified by another edit')
+        self.current_version = current_version
+
 class Workout(BaseModel):
     """Workout model for individual workout sessions within a program."""
     
@@ -12,6 +24,8 @@ class Workout(BaseModel):
     description = db.Column(db.Text)
     day_number = db.Column(db.Integer, nullable=True)
     notes = db.Column(db.Text)
+    # Incremented by every edit, for optimistic concurrency control
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Relationships
     exercises = db.relationship('WorkoutExercise', backref='workout', lazy='dynamic',
@@ -19,15 +33,16 @@ class Workout(BaseModel):
 
     def add_exercise(self, exercise_id, sets, reps=None, set_type='working', 
                     rest_time=None, notes=None, order_index=None):
-        """Add an exercise to the workout."""
+        """Add an exercise to the workout, after the last one unless order_index is given."""
         from .workout_exercise import WorkoutExercise
         
         if order_index is None:
-            # Get the next available order index
-            last_exercise = self.exercises.order_by(
-                WorkoutExercise.order_index.desc()
-            ).first()
-            order_index = (last_exercise.order_index + 1) if last_exercise else 0
+            # Resolved by the INSERT itself instead of a separate max() query
+            order_index = select(
+                func.coalesce(func.max(WorkoutExercise.order_index) + 1, 0)
+            ).where(
+                WorkoutExercise.workout_id == self.id
+            ).scalar_subquery()
 
         exercise = WorkoutExercise(
             workout_id=self.id,
@@ -43,16 +58,130 @@ class Workout(BaseModel):
         return exercise
 
     def reorder_exercises(self, exercise_order):
-        """Reorder exercises in the workout.
+        """Reorder exercises in the workout with a single UPDATE.
         
         Args:
             exercise_order (list): List of tuples (exercise_id, new_order_index)
         """
-        for exercise_id, new_index in exercise_order:
-            exercise = self.exercises.filter_by(id=exercise_id).first()
-            if exercise:
-                exercise.order_index = new_index
-                exercise.save()
+        self.apply_edit(self.version, updates=[
+            {'id': exercise_id, 'order_index': new_index}
+            for exercise_id, new_index in exercise_order
+        ])
+
+    def apply_edit(self, expected_version, fields=None, updates=None, inserts=None, deletes=None):
+        """Apply a whole edit of the workout and its exercises in one transaction.
+
+        The workout row is updated first, conditional on expected_version,
+        which both detects concurrent edits and locks the workout for the
+        rest of the transaction. Exercise updates and reorders are applied
+        with one UPDATE ... FROM (VALUES ...), new exercises with one
+        multi-row INSERT.
+
+        Args:
+            expected_version (int): Version the client based its edit on
+            fields (dict, optional): New values for EDITABLE_FIELDS
+            updates (list, optional): Dicts with an exercise 'id' and changed fields
+            inserts (list, optional): Dicts for new exercises; those without an
+                order_index are appended in order
+            deletes (list, optional): IDs of exercises to remove
+
+        Returns:
+            dict: The new 'version' and the 'created' exercise IDs in input order
+
+        Raises:
+            StaleWorkoutError: If the workout is no longer at expected_version.
+            ValueError: If the edit references exercises outside this workout
+                or removes exercises that have logged sets.
+        """
+        from .workout_exercise import WorkoutExercise
+        from .performance_log import PerformanceLog
+        from .tombstone import Tombstone
+
+        table = WorkoutExercise.__table__
+        now = datetime.utcnow()
+        updates, inserts, deletes = updates or [], inserts or [], deletes or []
+
+        try:
+            version = db.session.execute(
+                Workout.__table__.update().where(
+                    Workout.__table__.c.id == self.id,
+                    Workout.__table__.c.version == expected_version
+                ).values(
+                    version=Workout.__table__.c.version + 1,
+                    updated_at=now,
+                    **{name: value for name, value in (fields or {}).items() if name in EDITABLE_FIELDS}
+                ).returning(Workout.__table__.c.version)
+            ).scalar()
+            if version is None:
+                raise StaleWorkoutError(db.session.execute(
+                    select(Workout.__table__.c.version).where(Workout.__table__.c.id == self.id)
+                ).scalar())
+
+            if deletes:
+                logged = db.session.execute(
+                    select(PerformanceLog.workout_exercise_id).where(
+                        PerformanceLog.workout_exercise_id.in_(deletes)
+                    ).distinct()
+                ).scalars().all()
+                if logged:
+                    raise ValueError(
+                        f"Exercises with logged sets cannot be removed: {', '.join(map(str, sorted(logged)))}"
+                    )
+                deleted = db.session.execute(
+                    table.delete().where(
+                        table.c.id.in_(deletes),
+                        table.c.workout_id == self.id
+                    ).returning(table.c.id)
+                ).scalars().all()
+                if len(deleted) != len(set(deletes)):
+                    raise ValueError('Some exercises to remove are not part of this workout')
+                # Core deletes bypass the tombstone flush hook
+                db.session.execute(insert(Tombstone), [
+                    {'entity': 'workout_exercises', 'entity_id': exercise_id, 'deleted_at': now}
+                    for exercise_id in deleted
+                ])
+
+            if updates and WorkoutExercise.bulk_update(self.id, updates, now) != len(updates):
+                raise ValueError('Some exercises to update are not part of this workout')
+
+            created = []
+            if inserts:
+                next_index = None
+                if any(item.get('order_index') is None for item in inserts):
+                    next_index = db.session.execute(
+                        select(func.coalesce(func.max(table.c.order_index) + 1, 0)).where(
+                            table.c.workout_id == self.id
+                        )
+                    ).scalar()
+                rows = []
+                for item in inserts:
+                    order_index = item.get('order_index')
+                    if order_index is None:
+                        order_index, next_index = next_index, next_index + 1
+                    rows.append({
+                        'workout_id': self.id,
+                        'exercise_id': item['exercise_id'],
+                        'sets': item['sets'],
+                        'reps': item.get('reps'),
+                        'weight': item.get('weight'),
+                        'set_type': item.get('set_type') or 'working',
+                        'rest_time': item.get('rest_time'),
+                        'notes': item.get('notes'),
+                        'order_index': order_index,
+                        'created_at': now,
+                        'updated_at': now
+                    })
+                created = db.session.execute(
+                    insert(WorkoutExercise).returning(WorkoutExercise.id, sort_by_parameter_order=True),
+                    rows
+                ).scalars().all()
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'version': version, 'created': created}
 
     def get_performance_logs(self, athlete_id):
         """Get all performance logs for this workout by a specific athlete."""
@@ -76,6 +205,7 @@ class Workout(BaseModel):
             'description': self.description,
             'day_number': self.day_number,
             'notes': self.notes,
+            'version': self.version,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -1,6 +1,11 @@
+from datetime import datetime
+from sqlalchemy import case, cast, column, values
 from app import db
 from .base import BaseModel
 
+# Columns a workout edit may change on an existing workout exercise
+UPDATABLE_FIELDS = ('sets', 'reps', 'weight', 'set_type', 'rest_time', 'notes', 'order_index')
+
 class WorkoutExercise(BaseModel):
     """Junction model between workouts and exercises with additional metadata."""
     
@@ -21,7 +26,56 @@ class WorkoutExercise(BaseModel):
     # Relationships
     performance_logs = db.relationship('PerformanceLog', backref='workout_exercise', 
                                      lazy='dynamic', cascade='all, delete-orphan')
-    exercise = db.relationship('Exercise', lazy='joined')
+    exercise = db.relationship('Exercise', lazy='select')
+
+    @classmethod
+    def bulk_update(cls, workout_id, rows, now=None):
+        """Update many exercises of one workout with a single UPDATE ... FROM (VALUES ...).
+
+        Fields missing from a row keep their current value; fields given as
+        None are set to NULL. Does not commit.
+
+        Args:
+            workout_id (int): Workout the exercises must belong to
+            rows (list): Dicts with 'id' and any of UPDATABLE_FIELDS
+            now (datetime, optional): Timestamp to record as updated_at
+
+        Returns:
+            int: Number of rows updated
+        """
+        if not rows:
+            return 0
+
+        table = cls.__table__
+        names = [name for name in UPDATABLE_FIELDS if any(name in row for row in rows)]
+        # Each field travels with a flag telling a given NULL from a missing field
+        changes = values(
+            column('id', db.Integer),
+            *[column(name, table.c[name].type) for name in names],
+            *[column(f'has_{name}', db.Boolean) for name in names],
+            name='changes'
+        ).data([
+            (row['id'], *(row.get(name) for name in names), *(name in row for name in names))
+            for row in rows
+        ])
+
+        # Casts keep all-NULL VALUES columns (typed text by Postgres) comparable
+        assignments = {
+            name: case(
+                (changes.c[f'has_{name}'], cast(changes.c[name], table.c[name].type)),
+                else_=table.c[name]
+            )
+            for name in names
+        }
+        assignments['updated_at'] = now or datetime.utcnow()
+
+        result = db.session.execute(
+            table.update().where(
+                table.c.id == changes.c.id,
+                table.c.workout_id == workout_id
+            ).values(**assignments)
+        )
+        return result.rowcount
 
     def log_performance(self, athlete_id, set_number, weight=None, reps=None, 
                        rpe=None, video_url=None, notes=None):
@@ -64,7 +118,9 @@ class WorkoutExercise(BaseModel):
         }
         
         if include_exercise:
-            data['exercise'] = self.exercise.to_dict()
+            # Served from the shared catalog snapshot instead of a per-row load
+            from app.utils.catalog import get_catalog
+            data['exercise'] = get_catalog().get(self.exercise_id) or self.exercise.to_dict()
             
         if include_performance and athlete_id:
             data['performance_logs'] = [
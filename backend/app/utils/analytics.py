@@ -0,0 +1,194 @@
+import json
+import logging
+import numpy as np
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import db
+from app.models import PerformanceLog, WorkoutExercise
+from app.utils.archive import archived_training_history
+from app.utils.cache import get_redis, get_version, bump_version
+from app.utils.db_routing import primary_reads
+
+logger = logging.getLogger(__name__)
+
+# athlete_id -> (version, result) for when Redis is unavailable
+_local_cache = {}
+
+def history_version_name(athlete_id):
+    """Name of the version counter bumped whenever an athlete logs a set."""
+    return f'training_history:{athlete_id}'
+
+def load_training_history(athlete_id):
+    """Load an athlete's full set history as columnar NumPy arrays.
+
+    Live sets come from one query; archived sets are read from the athlete's
+    Parquet files, limited to the columns used here.
+
+    Returns:
+        dict: 'logged_at' (datetime64[s]), 'exercise_id' (int64), 'weight',
+            'reps' and 'rpe' (float64, NaN where missing), sorted by time
+    """
+    rows = db.session.query(
+        PerformanceLog.logged_at,
+        WorkoutExercise.exercise_id,
+        PerformanceLog.weight,
+        PerformanceLog.reps,
+        PerformanceLog.rpe
+    ).join(
+        WorkoutExercise
+    ).filter(
+        PerformanceLog.athlete_id == athlete_id
+    ).order_by(
+        PerformanceLog.logged_at
+    ).all()
+
+    columns = [list(values) for values in zip(*rows)] if rows else [[] for _ in range(5)]
+    # Sets moved to cold storage come first; they predate everything still in Postgres
+    archived = archived_training_history(athlete_id)
+    if archived:
+        names = ('logged_at', 'exercise_id', 'weight', 'reps', 'rpe')
+        for values, name in zip(columns, names):
+            values[:0] = archived[name]
+    if not columns[0]:
+        return None
+
+    logged_at, exercise_id, weight, reps, rpe = columns
+    history = {
+        'logged_at': np.array(logged_at, dtype='datetime64[s]'),
+        'exercise_id': np.array(exercise_id, dtype=np.int64),
+        'weight': np.array([np.nan if w is None else float(w) for w in weight], dtype=np.float64),
+        'reps': np.array([np.nan if r is None else r for r in reps], dtype=np.float64),
+        'rpe': np.array([np.nan if r is None else float(r) for r in rpe], dtype=np.float64),
+    }
+    if archived:
+        order = np.argsort(history['logged_at'], kind='stable')
+        history = {name: values[order] for name, values in history.items()}
+    return history
+
+def _rolling_sum(values, window):
+    """Trailing rolling sum over a daily series, including the current day."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return csum[end] - csum[start]
+
+def _to_list(values, decimals=2):
+    """Convert an array to a JSON-friendly list, mapping NaN/inf to None."""
+    rounded = np.round(values.astype(np.float64), decimals)
+    return [None if not np.isfinite(v) else float(v) for v in rounded]
+
+def compute_training_load(history, acute_days=7, chronic_days=28):
+    """Compute daily load, ACWR, monotony, strain and e1RM trends over a whole history.
+
+    Daily load is total volume (weight x reps). The acute:chronic workload
+    ratio compares the trailing acute-window load with the trailing
+    chronic-window load scaled to the same window length. Monotony is the
+    mean over the standard deviation of daily load in the acute window, and
+    strain is acute load times monotony.
+    """
+    days = history['logged_at'].astype('datetime64[D]')
+    first_day = days[0]
+    day_index = (days - first_day).astype(np.int64)
+    n_days = int(day_index[-1]) + 1
+
+    volume = np.nan_to_num(history['weight'] * history['reps'])
+    daily_load = np.bincount(day_index, weights=volume, minlength=n_days)
+
+    acute = _rolling_sum(daily_load, acute_days)
+    chronic = _rolling_sum(daily_load, chronic_days) * (acute_days / chronic_days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+
+        mean = acute / acute_days
+        mean_sq = _rolling_sum(daily_load ** 2, acute_days) / acute_days
+        std = np.sqrt(np.maximum(mean_sq - mean ** 2, 0))
+        monotony = np.where(std > 0, mean / std, np.nan)
+    strain = acute * monotony
+
+    # Best estimated 1RM per exercise per training day (Epley)
+    reps = history['reps']
+    e1rm = np.where(reps == 1, history['weight'], history['weight'] * (1 + reps / 30.0))
+    valid = np.isfinite(e1rm) & (reps > 0)
+    e1rm_trends = {}
+    for exercise_id in np.unique(history['exercise_id'][valid]):
+        mask = valid & (history['exercise_id'] == exercise_id)
+        best = np.full(n_days, -np.inf)
+        np.maximum.at(best, day_index[mask], e1rm[mask])
+        trained = np.flatnonzero(np.isfinite(best))
+        e1rm_trends[int(exercise_id)] = {
+            'dates': [str(first_day + d) for d in trained],
+            'values': _to_list(best[trained])
+        }
+
+    dates = first_day + np.arange(n_days)
+    return {
+        'dates': [str(d) for d in dates],
+        'daily_load': _to_list(daily_load),
+        'acute_load': _to_list(acute),
+        'chronic_load': _to_list(chronic),
+        'acwr': _to_list(acwr),
+        'monotony': _to_list(monotony),
+        'strain': _to_list(strain),
+        'e1rm': e1rm_trends
+    }
+
+def get_training_analytics(athlete_id):
+    """Get an athlete's training analytics, cached until they log a new set."""
+    version = get_version(history_version_name(athlete_id))
+    key = f'analytics:{athlete_id}:{version}'
+
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = client.get(key)
+            if cached:
+                return json.loads(cached)
+        except RedisError as e:
+            logger.warning('Could not read analytics cache: %s', str(e))
+    cached = _local_cache.get(athlete_id)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with primary_reads():
+        history = load_training_history(athlete_id)
+    result = {'athlete_id': athlete_id}
+    if history is not None:
+        result.update(compute_training_load(
+            history,
+            acute_days=current_app.config.get('ANALYTICS_ACUTE_DAYS', 7),
+            chronic_days=current_app.config.get('ANALYTICS_CHRONIC_DAYS', 28)
+        ))
+
+    if client is not None:
+        try:
+            client.set(key, json.dumps(result), ex=current_app.config.get('ANALYTICS_CACHE_SECONDS', 86400))
+        except RedisError as e:
+            logger.warning('Could not write analytics cache: %s', str(e))
+    if len(_local_cache) >= current_app.config.get('ANALYTICS_LOCAL_CACHE_SIZE', 256):
+        _local_cache.clear()
+    _local_cache[athlete_id] = (version, result)
+    return result
+
+def mark_history_changed(session, athlete_id):
+    """Invalidate an athlete's analytics once the current transaction commits."""
+    session.info.setdefault('changed_athlete_histories', set()).add(athlete_id)
+
+@event.listens_for(Session, 'after_flush')
+def _track_history_changes(session, flush_context):
+    """Remember which athletes' performance logs this transaction changed."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, PerformanceLog):
+            mark_history_changed(session, obj.athlete_id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_analytics(session):
+    """Bump the history version of every athlete whose logs were committed."""
+    for athlete_id in session.info.pop('changed_athlete_histories', ()):
+        bump_version(history_version_name(athlete_id))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_history_changes(session):
+    """Forget history changes that were rolled back."""
+    session.info.pop('changed_athlete_histories', None)
@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from flask import current_app
+from sqlalchemy import cast, select
+from app.database import db
+from app.models import PerformanceLog, PerformanceLogPose, WorkoutExercise, FormAnalysis, PersonalRecord
+
+logger = logging.getLogger(__name__)
+
+# Archived rows are denormalized with the exercise and workout they belong to,
+# so reads never need the workout_exercises rows they were logged against.
+PERFORMANCE_LOG_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('athlete_id', pa.int64()),
+    ('workout_exercise_id', pa.int64()),
+    ('exercise_id', pa.int64()),
+    ('workout_id', pa.int64()),
+    ('set_number', pa.int32()),
+    ('weight', pa.decimal128(10, 2)),
+    ('reps', pa.int32()),
+    ('rpe', pa.decimal128(3, 1)),
+    ('video_url', pa.string()),
+    ('notes', pa.string()),
+    ('logged_at', pa.timestamp('us')),
+    ('form_score', pa.float64()),
+    ('created_at', pa.timestamp('us')),
+    ('updated_at', pa.timestamp('us')),
+])
+
+FORM_ANALYSIS_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('performance_log_id', pa.int64()),
+    ('athlete_id', pa.int64()),
+    ('exercise_id', pa.int64()),
+    ('video_url', pa.string()),
+    ('pose_data', pa.string()),  # JSON text
+    ('form_score', pa.float64()),
+    ('feedback', pa.string()),
+    ('created_at', pa.timestamp('us')),
+])
+
+POSE_SCHEMA = pa.schema([
+    ('performance_log_id', pa.int64()),
+    ('athlete_id', pa.int64()),
+    ('logged_at', pa.timestamp('us')),
+    ('pose_data', pa.string()),  # JSON text
+    ('created_at', pa.timestamp('us')),
+])
+
+MONTH_PARTITIONING = ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+
+def archive_root():
+    return current_app.config['ARCHIVE_DIR']
+
+def athlete_dir(dataset, athlete_id):
+    """Directory holding one athlete's archived files for a dataset."""
+    return os.path.join(archive_root(), dataset, f'athlete_id={athlete_id}')
+
+def _write_partition(dataset, athlete_id, month, rows, schema, key='id'):
+    """Merge rows into the single Parquet file of one athlete-month.
+
+    Rows already in the file with the same key column are replaced, so re-running
+    an archive that failed before its delete committed, or archiving a
+    month again in later batches, never duplicates rows. The merged file is
+    written aside and renamed over the old one.
+    """
+    directory = os.path.join(athlete_dir(dataset, athlete_id), f'month={month}')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'part.parquet')
+
+    table = pa.Table.from_pylist(rows, schema=schema)
+    # Files of older runs in the same month are folded into part.parquet
+    existing = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith('.parquet') and not name.startswith('.')
+    )
+    if existing:
+        table = pa.concat_tables([*(pq.read_table(file, schema=schema) for file in existing), table])
+    # Keep the last copy of each key, which is the one being written now
+    last = {row_key: index for index, row_key in enumerate(table.column(key).to_pylist())}
+    table = table.take(pa.array([last[row_key] for row_key in sorted(last)], type=pa.int64()))
+
+    # Dot-prefixed files are skipped by dataset discovery until renamed
+    tmp_path = os.path.join(directory, '.part.parquet.tmp')
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    for file in existing:
+        if file != path:
+            os.remove(file)
+    return path
+
+def _month_windows(start, cutoff):
+    """Yield (window_start, window_end) calendar months from start up to cutoff."""
+    current = datetime(start.year, start.month, 1)
+    while current < cutoff:
+        following = datetime(current.year + (current.month == 12), current.month % 12 + 1, 1)
+        yield current, min(following, cutoff)
+        current = following
+
+def archive_before(cutoff, batch_size=None):
+    """Move performance logs logged before cutoff, with their poses and analyses, to Parquet.
+
+    Works one calendar month at a time: each month is read, written to
+    files partitioned by athlete and month, and deleted from Postgres in
+    its own transaction. Personal records of archived logs are kept and
+    marked archived, so rebuilds and backfills never lower or remove them.
+
+    Returns:
+        dict: Number of archived 'performance_logs', 'performance_log_poses'
+            and 'form_analyses'
+    """
+    batch_size = batch_size or current_app.config.get('ARCHIVE_BATCH_SIZE', 50000)
+    totals = {'performance_logs': 0, 'performance_log_poses': 0, 'form_analyses': 0}
+
+    oldest = db.session.execute(select(db.func.min(PerformanceLog.logged_at))).scalar()
+    if oldest is None or oldest >= cutoff:
+        return totals
+
+    for window_start, window_end in _month_windows(oldest, cutoff):
+        month = window_start.strftime('%Y-%m')
+        while True:
+            logs = db.session.execute(
+                select(
+                    *[column for column in PerformanceLog.__table__.columns],
+                    WorkoutExercise.exercise_id,
+                    WorkoutExercise.workout_id
+                ).join(
+                    WorkoutExercise, WorkoutExercise.id == PerformanceLog.workout_exercise_id
+                ).where(
+                    PerformanceLog.logged_at >= window_start,
+                    PerformanceLog.logged_at < window_end
+                ).order_by(
+                    PerformanceLog.athlete_id, PerformanceLog.id
+                ).limit(batch_size)
+            ).mappings().all()
+            if not logs:
+                break
+
+            log_ids = [row['id'] for row in logs]
+            athletes = {row['id']: row['athlete_id'] for row in logs}
+            # Payloads are copied as the JSON text Postgres stores
+            poses = [
+                dict(row, athlete_id=athletes[row['performance_log_id']])
+                for row in db.session.execute(
+                    select(
+                        PerformanceLogPose.performance_log_id,
+                        PerformanceLogPose.logged_at,
+                        cast(PerformanceLogPose.pose_data, db.Text).label('pose_data'),
+                        PerformanceLogPose.created_at
+                    ).where(PerformanceLogPose.performance_log_id.in_(log_ids))
+                ).mappings()
+            ]
+            analyses = db.session.execute(
+                select(*[column for column in FormAnalysis.__table__.columns]).where(
+                    FormAnalysis.performance_log_id.in_(log_ids)
+                )
+            ).mappings().all()
+
+            try:
+                for dataset, rows, schema, key in (
+                    ('performance_logs', logs, PERFORMANCE_LOG_SCHEMA, 'id'),
+                    ('performance_log_poses', poses, POSE_SCHEMA, 'performance_log_id'),
+                    ('form_analyses', analyses, FORM_ANALYSIS_SCHEMA, 'id'),
+                ):
+                    by_athlete = {}
+                    for row in rows:
+                        record = {name: row[name] for name in schema.names}
+                        if dataset == 'form_analyses' and record['pose_data'] is not None:
+                            record['pose_data'] = json.dumps(record['pose_data'])
+                        by_athlete.setdefault(row['athlete_id'], []).append(record)
+                    for athlete_id, athlete_rows in by_athlete.items():
+                        _write_partition(dataset, athlete_id, month, athlete_rows, schema, key)
+
+                db.session.execute(
+                    PersonalRecord.__table__.update().where(
+                        PersonalRecord.performance_log_id.in_(log_ids)
+                    ).values(archived=True)
+                )
+                db.session.execute(
+                    FormAnalysis.__table__.delete().where(FormAnalysis.performance_log_id.in_(log_ids))
+                )
+                db.session.execute(
+                    PerformanceLogPose.__table__.delete().where(
+                        PerformanceLogPose.performance_log_id.in_(log_ids)
+                    )
+                )
+                db.session.execute(
+                    PerformanceLog.__table__.delete().where(PerformanceLog.id.in_(log_ids))
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            totals['performance_logs'] += len(logs)
+            totals['performance_log_poses'] += len(poses)
+            totals['form_analyses'] += len(analyses)
+            logger.info('Archived %s performance logs for %s', len(logs), month)
+
+    return totals
+
+def scan(dataset, athlete_id, columns, expression=None):
+    """Read archived rows for one athlete, reading only the requested columns.
+
+    Args:
+        dataset (str): 'performance_logs', 'performance_log_poses' or 'form_analyses'
+        athlete_id (int): Athlete whose archive to read
+        columns (list): Columns to read
+        expression: Optional pyarrow.dataset filter, pushed down to row groups
+
+    Returns:
+        pyarrow.Table: Matching rows, or None if the athlete has no archive
+    """
+    directory = athlete_dir(dataset, athlete_id)
+    if not os.path.isdir(directory):
+        return None
+    archived = ds.dataset(directory, format='parquet', partitioning=MONTH_PARTITIONING)
+    return archived.to_table(columns=list(columns), filter=expression)
+
+def scan_batches(dataset, athlete_id, columns, expression=None, batch_size=10000):
+    """Stream archived rows for one athlete as lists of dicts, one record batch at a time."""
+    directory = athlete_dir(dataset, athlete_id)
+    if not os.path.isdir(directory):
+        return
+    archived = ds.dataset(directory, format='parquet', partitioning=MONTH_PARTITIONING)
+    for batch in archived.to_batches(columns=list(columns), filter=expression, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pylist()
+
+def archived_months(dataset, athlete_id):
+    """Months ('YYYY-MM') with archived rows for one athlete, oldest first."""
+    directory = athlete_dir(dataset, athlete_id)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name.split('=', 1)[1] for name in os.listdir(directory) if name.startswith('month=')
+    )
+
+def archived_until(athlete_id):
+    """Start of the month after the athlete's newest archived log, or None.
+
+    Every archived log was logged before this, so pages of newer live logs
+    never need to read the archive.
+    """
+    months = archived_months('performance_logs', athlete_id)
+    if not months:
+        return None
+    year, month = map(int, months[-1].split('-'))
+    return datetime(year + (month == 12), month % 12 + 1, 1)
+
+def archived_logs_page(athlete_id, columns, before=None, limit=50, exercise_id=None, workout_id=None):
+    """Read a page of archived performance logs, newest first.
+
+    Only the month partitions the cursor can reach are read, newest first,
+    and reading stops as soon as limit + 1 rows are collected.
+
+    Args:
+        athlete_id (int): Athlete whose logs to read
+        columns (list): Log columns to return
+        before (tuple, optional): (logged_at, id) key to continue after
+        limit (int): Page size
+        exercise_id (int, optional): Only logs of this exercise
+        workout_id (int, optional): Only logs of this workout
+
+    Returns:
+        tuple: (rows, has_more) with rows as dicts holding columns plus
+            logged_at and id
+    """
+    months = archived_months('performance_logs', athlete_id)
+    conditions = []
+    if exercise_id is not None:
+        conditions.append(ds.field('exercise_id') == exercise_id)
+    if workout_id is not None:
+        conditions.append(ds.field('workout_id') == workout_id)
+    if before is not None:
+        logged_at, log_id = before
+        months = [month for month in months if month <= logged_at.strftime('%Y-%m')]
+        logged_at = pa.scalar(logged_at, type=pa.timestamp('us'))
+        conditions.append(
+            (ds.field('logged_at') < logged_at) |
+            ((ds.field('logged_at') == logged_at) & (ds.field('id') < log_id))
+        )
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    needed = list(dict.fromkeys([*columns, 'logged_at', 'id']))
+    rows = []
+    for month in reversed(months):
+        directory = os.path.join(athlete_dir('performance_logs', athlete_id), f'month={month}')
+        table = ds.dataset(directory, format='parquet').to_table(columns=needed, filter=expression)
+        if table.num_rows:
+            # Months hold disjoint time ranges, so sorting within one is enough
+            indices = pc.sort_indices(table, sort_keys=[('logged_at', 'descending'), ('id', 'descending')])
+            rows.extend(table.take(indices[:limit + 1 - len(rows)]).to_pylist())
+        if len(rows) > limit:
+            break
+    return rows[:limit], len(rows) > limit
+
+def archived_training_history(athlete_id):
+    """Archived sets for training analytics, as columns of Python lists."""
+    table = scan('performance_logs', athlete_id, ['logged_at', 'exercise_id', 'weight', 'reps', 'rpe'])
+    if table is None or table.num_rows == 0:
+        return None
+    return {
+        'logged_at': table.column('logged_at').to_pylist(),
+        'exercise_id': table.column('exercise_id').to_pylist(),
+        'weight': pc.cast(table.column('weight'), pa.float64()).to_pylist(),
+        'reps': table.column('reps').to_pylist(),
+        'rpe': pc.cast(table.column('rpe'), pa.float64()).to_pylist(),
+    }
@@ -1,11 +1,27 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify, current_app, g
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app.database import db
 from app.models import User
+from app.utils.cache import get_version, bump_version
+from app.utils.db_routing import primary_reads
 
-def create_access_token(user_id, expires_delta=None):
-    """Create a new access token for a user."""
+PRINCIPAL_VERSION = 'principals'
+
+# user_id -> (expires_at, version, role), least recently used first; role is
+# None for users that no longer exist
+_principals = OrderedDict()
+_principals_lock = threading.Lock()
+
+def create_access_token(user_id, expires_delta=None, role=None):
+    """Create a new access token for a user, carrying their role as a claim."""
     if expires_delta is None:
         expires_delta = timedelta(days=1)  # Default to 1 day
         
@@ -15,6 +31,8 @@ def create_access_token(user_id, expires_delta=None):
         'exp': expire,
         'user_id': str(user_id)
     }
+    if role is not None:
+        to_encode['role'] = role
     
     encoded_jwt = jwt.encode(
         to_encode,
@@ -36,6 +54,92 @@ def decode_token(token):
     except JWTError:
         return None
 
+class LazyUser:
+    """The authenticated user, loaded from the database only when needed.
+
+    id and role are known from the verified token and principal cache;
+    reading or setting any other attribute loads the User row (once per
+    request) and delegates to it.
+    """
+
+    __slots__ = ('id', 'role', '_user')
+
+    def __init__(self, user_id, role):
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, 'role', role)
+        object.__setattr__(self, '_user', None)
+
+    def _load(self):
+        if self._user is None:
+            object.__setattr__(self, '_user', db.session.get(User, self.id))
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        if name in LazyUser.__slots__:
+            raise AttributeError(f'{name} is read-only on the authenticated user')
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        return f'<LazyUser {self.id} {self.role}>'
+
+def get_principal(user_id):
+    """Get a user's current role, cached per process.
+
+    Entries live for AUTH_PRINCIPAL_CACHE_SECONDS in an LRU of at most
+    AUTH_PRINCIPAL_CACHE_SIZE users, and are dropped everywhere as soon as
+    a role change or account deletion is committed.
+
+    Returns:
+        str: The user's role, or None if the user no longer exists
+    """
+    version = get_version(PRINCIPAL_VERSION)
+    now = time.monotonic()
+    with _principals_lock:
+        cached = _principals.get(user_id)
+        if cached and cached[0] > now and cached[1] == version:
+            _principals.move_to_end(user_id)
+            return cached[2]
+
+    with primary_reads():
+        role = db.session.execute(select(User.role).where(User.id == user_id)).scalar()
+
+    ttl = current_app.config.get('AUTH_PRINCIPAL_CACHE_SECONDS', 60)
+    size = current_app.config.get('AUTH_PRINCIPAL_CACHE_SIZE', 10000)
+    with _principals_lock:
+        _principals[user_id] = (now + ttl, version, role)
+        _principals.move_to_end(user_id)
+        while len(_principals) > size:
+            _principals.popitem(last=False)
+    return role
+
+@event.listens_for(Session, 'after_flush')
+def _track_principal_changes(session, flush_context):
+    """Remember users whose role changed or who were deleted in this transaction."""
+    changed = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes()
+    ]
+    changed.extend(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault('principals_changed', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_principals(session):
+    """Drop cached principals in every process once the change is committed."""
+    changed = session.info.pop('principals_changed', None)
+    if changed:
+        with _principals_lock:
+            for user_id in changed:
+                _principals.pop(user_id, None)
+        bump_version(PRINCIPAL_VERSION)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_principal_changes(session):
+    session.info.pop('principals_changed', None)
+
 def get_current_user():
     """Get the current authenticated user."""
     return g.current_user if hasattr(g, 'current_user') else None
@@ -65,12 +169,16 @@ def jwt_required(f):
         if not payload:
             return jsonify({'error': 'Invalid or expired token'}), 401
         
-        user = User.query.get(int(payload['user_id']))
-        if not user:
+        user_id = int(payload['user_id'])
+        role = get_principal(user_id)
+        if role is None:
             return jsonify({'error': 'User not found'}), 401
+        # Tokens issued before a role change are no longer valid
+        if payload.get('role', role) != role:
+            return jsonify({'error': 'Invalid or expired token'}), 401
         
-        # Store user in flask.g for the current request
-        g.current_user = user
+        # Store user in flask.g for the current request; the row loads on first use
+        g.current_user = LazyUser(user_id, role)
         
         return f(*args, **kwargs)
     
@@ -104,3 +212,19 @@ def athlete_required(f):
             return jsonify({'error': 'Athlete access required'}), 403
         return f(*args, **kwargs)
     return jwt_required(decorated_function)
+
+def admin_token_required(f):
+    """Decorator to require the operator ADMIN_TOKEN in the X-Admin-Token header.
+
+    Routes behind it do not exist (404) unless ADMIN_TOKEN is configured.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        expected = current_app.config.get('ADMIN_TOKEN')
+        if not expected:
+            return jsonify({'error': 'Not found'}), 404
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            return jsonify({'error': 'Admin token required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,87 @@
+import threading
+import time
+import logging
+from flask import current_app
+from redis import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+# name -> (version, checked_at); shared by every request in this process
+_versions = {}
+_versions_lock = threading.Lock()
+
+# Monotonic time until which version reads and bumps skip Redis after an error
+_version_retry_at = 0
+
+def get_redis():
+    """Return the shared Redis client, or None if Redis is not configured."""
+    global _redis_client
+    url = current_app.config.get('REDIS_URL')
+    if not url:
+        return None
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                _redis_client = Redis.from_url(
+                    url,
+                    socket_timeout=current_app.config.get('REDIS_SOCKET_TIMEOUT', 0.5),
+                    socket_connect_timeout=current_app.config.get('REDIS_SOCKET_TIMEOUT', 0.5)
+                )
+    return _redis_client
+
+def _version_client():
+    """The Redis client for version counters, or None while backing off."""
+    return get_redis() if time.monotonic() >= _version_retry_at else None
+
+def _back_off():
+    global _version_retry_at
+    _version_retry_at = time.monotonic() + current_app.config.get('VERSION_REDIS_RETRY_SECONDS', 5)
+
+def get_version(name):
+    """Get the current version of a named, cross-process invalidated resource.
+
+    The version lives in Redis so a bump in any gunicorn worker or Celery
+    process is seen everywhere. Each process re-reads it at most once per
+    VERSION_CHECK_SECONDS; if Redis is unavailable the last known (or local)
+    version is used, and Redis is left alone for VERSION_REDIS_RETRY_SECONDS.
+    """
+    now = time.monotonic()
+    interval = current_app.config.get('VERSION_CHECK_SECONDS', 1.0)
+    cached = _versions.get(name)
+    if cached and now - cached[1] < interval:
+        return cached[0]
+
+    version = cached[0] if cached else 0
+    client = _version_client()
+    if client is not None:
+        try:
+            version = int(client.get(f'version:{name}') or 0)
+        except RedisError as e:
+            _back_off()
+            logger.warning('Could not read version %s from Redis: %s', name, str(e))
+
+    with _versions_lock:
+        _versions[name] = (version, now)
+    return version
+
+def bump_version(name):
+    """Invalidate a named resource in every process by incrementing its version."""
+    client = _version_client()
+    version = None
+    if client is not None:
+        try:
+            version = int(client.incr(f'version:{name}'))
+        except RedisError as e:
+            _back_off()
+            logger.warning('Could not bump version %s in Redis: %s', name, str(e))
+
+    with _versions_lock:
+        if version is None:
+            # Redis is down: at least invalidate this process
+            version = _versions.get(name, (0, 0))[0] + 1
+        _versions[name] = (version, time.monotonic())
+    return version
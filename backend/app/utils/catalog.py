@@ -0,0 +1,96 @@
+import hashlib
+import json
+import threading
+import time
+from bisect import bisect_right
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import Exercise
+from app.utils.cache import get_version, bump_version
+from app.utils.db_routing import primary_reads
+
+CATALOG_VERSION = 'exercise_catalog'
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+class ExerciseCatalog:
+    """Immutable, process-local snapshot of the exercise library."""
+
+    def __init__(self, version, exercises):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._by_id = {exercise['id']: exercise for exercise in exercises}
+        self._by_name = {exercise['name'].strip().lower(): exercise['id'] for exercise in exercises}
+        self.ids = tuple(sorted(self._by_id))
+        serialized = json.dumps(exercises, sort_keys=True, default=str).encode()
+        self.etag = f'exercises-{version}-{hashlib.sha1(serialized).hexdigest()[:16]}'
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, exercise_id):
+        return exercise_id in self._by_id
+
+    def get(self, exercise_id):
+        """Return a copy of the serialized exercise, or None if it does not exist."""
+        exercise = self._by_id.get(exercise_id)
+        return dict(exercise) if exercise is not None else None
+
+    def id_for_name(self, name):
+        """Return the ID of the exercise with this name (case-insensitive), or None."""
+        return self._by_name.get(name.strip().lower()) if name else None
+
+    def page(self, after_id=None, limit=50):
+        """Return (exercises, last_id) for the page of IDs after after_id."""
+        start = bisect_right(self.ids, after_id) if after_id is not None else 0
+        ids = self.ids[start:start + limit + 1]
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        return [self.get(i) for i in ids], (ids[-1] if has_more else None)
+
+def get_catalog():
+    """Return the current exercise catalog, rebuilding it if its version changed.
+
+    Snapshots are also rebuilt after CATALOG_MAX_AGE_SECONDS, so a process
+    that cannot see version bumps (Redis down) still picks up changes.
+    """
+    global _snapshot
+    version = get_version(CATALOG_VERSION)
+    max_age = current_app.config.get('CATALOG_MAX_AGE_SECONDS', 60)
+
+    def current(snapshot):
+        return (snapshot is not None and snapshot.version == version
+                and time.monotonic() - snapshot.loaded_at < max_age)
+
+    snapshot = _snapshot
+    if current(snapshot):
+        return snapshot
+
+    with _snapshot_lock:
+        if not current(_snapshot):
+            # Read the version before loading so a concurrent bump forces a reload
+            with primary_reads():
+                exercises = [exercise.to_dict() for exercise in Exercise.query.order_by(Exercise.id).all()]
+            _snapshot = ExerciseCatalog(version, exercises)
+        return _snapshot
+
+@event.listens_for(Session, 'after_flush')
+def _track_exercise_changes(session, flush_context):
+    """Remember whether this transaction touched any exercise."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Exercise):
+            session.info['exercise_catalog_changed'] = True
+            break
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    """Bump the catalog version once the exercise changes are committed."""
+    if session.info.pop('exercise_catalog_changed', False):
+        bump_version(CATALOG_VERSION)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    """Forget pending exercise changes that were rolled back."""
+    session.info.pop('exercise_catalog_changed', None)
@@ -0,0 +1,195 @@
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional encoding
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+class _GzipCompressor:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # Sync flush, so every chunk of a streamed body reaches the client
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class _BrotliCompressor:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+class _ZstdCompressor:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+COMPRESSORS = {'gzip': _GzipCompressor}
+if brotli is not None:
+    COMPRESSORS['br'] = _BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = _ZstdCompressor
+
+class CompressedCache:
+    """LRU of compressed bodies for responses with a strong ETag, bounded in bytes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data, max_bytes):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+compressed_cache = CompressedCache()
+
+def negotiate_encoding():
+    """Pick the client's best accepted encoding from COMPRESSION_ENCODINGS, or None."""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in current_app.config.get('COMPRESSION_ENCODINGS', ('gzip',)):
+        if encoding not in COMPRESSORS:
+            continue
+        quality = accepted[encoding]
+        # Earlier entries in the config win ties
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding, level):
+    compressor = COMPRESSORS[encoding](level)
+    return compressor.compress(data) + compressor.finish()
+
+def compress_stream(chunks, encoding, level, cache_key=None, cache_limits=None):
+    """Compress a streamed body chunk by chunk, flushing after every chunk.
+
+    With a cache_key, the compressed output is also kept in compressed_cache
+    if the whole body stays under the per-entry limit.
+    """
+    compressor = COMPRESSORS[encoding](level)
+    kept = bytearray() if cache_key else None
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compressor.compress(chunk) + compressor.flush()
+            if kept is not None:
+                kept += data
+                if len(kept) > cache_limits[0]:
+                    kept = None
+            if data:
+                yield data
+        data = compressor.finish()
+        if kept is not None:
+            compressed_cache.put(cache_key, bytes(kept + data), cache_limits[1])
+        yield data
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def _strong_etag(response):
+    etag, weak = response.get_etag()
+    return etag if etag and not weak else None
+
+def init_compression(app):
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies of compressible types over COMPRESSION_MIN_BYTES are compressed
+    whole; streamed bodies are compressed as they are produced. Responses
+    with a strong ETag keep their compressed bytes in a small LRU, so hot
+    unchanged payloads are compressed once. Compressed responses carry a
+    weak ETag, which the conditional GET helpers still match.
+    """
+
+    @app.after_request
+    def _compress_response(response):
+        config = current_app.config
+        if not config.get('COMPRESSION_ENABLED') or request.method == 'HEAD':
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if response.mimetype not in config.get('COMPRESSION_MIMETYPES', ()):
+            return response
+        response.vary.add('Accept-Encoding')
+        if 'Content-Encoding' in response.headers or response.direct_passthrough:
+            return response
+
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        level = config.get('COMPRESSION_LEVELS', {}).get(encoding, 6)
+        etag = _strong_etag(response)
+        cache_key = (request.full_path, etag, encoding) if etag else None
+        cached = compressed_cache.get(cache_key) if cache_key else None
+
+        if cached is not None:
+            if response.is_streamed and hasattr(response.response, 'close'):
+                response.response.close()
+            response.set_data(cached)
+        elif response.is_streamed:
+            limits = (
+                config.get('COMPRESSION_CACHE_MAX_ENTRY_BYTES', 2 * 1024 * 1024),
+                config.get('COMPRESSION_CACHE_BYTES', 32 * 1024 * 1024)
+            )
+            response.response = compress_stream(response.response, encoding, level, cache_key, limits)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < config.get('COMPRESSION_MIN_BYTES', 1024):
+                return response
+            compressed = compress(body, encoding, level)
+            if cache_key and len(compressed) <= config.get('COMPRESSION_CACHE_MAX_ENTRY_BYTES', 2 * 1024 * 1024):
+                compressed_cache.put(cache_key, compressed, config.get('COMPRESSION_CACHE_BYTES', 32 * 1024 * 1024))
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,134 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from app.database import db
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# coach_id -> (expires_at, result) for when Redis is unavailable
+_local_cache = {}
+
+# One row per athlete on any of the coach's active programs. Last session and
+# latest form score are index-backed LATERAL lookups; adherence is the share of
+# workout exercises due so far (day_number counted from the athlete's start
+# date) that the athlete has logged since then.
+DASHBOARD_SQL = """
+WITH roster AS (
+    SELECT ap.athlete_id, ap.program_id, ap.start_date
+    FROM athlete_programs ap
+    JOIN programs p ON p.id = ap.program_id
+    WHERE p.coach_id = :coach_id AND ap.status = 'active'
+),
+adherence AS (
+    SELECT athlete_id, count(*) AS prescribed, count(*) FILTER (WHERE done) AS completed
+    FROM (
+        SELECT r.athlete_id, EXISTS (
+            SELECT 1 FROM performance_logs pl
+            WHERE pl.athlete_id = r.athlete_id
+                AND pl.workout_exercise_id = we.id
+                AND pl.logged_at >= r.start_date
+        ) AS done
+        FROM roster r
+        JOIN workouts w ON w.program_id = r.program_id
+        JOIN workout_exercises we ON we.workout_id = w.id
+        WHERE w.day_number IS NULL OR r.start_date + (w.day_number - 1) <= current_date
+    ) prescribed
+    GROUP BY athlete_id
+),
+weekly AS (
+    SELECT athlete_id, sum(weight * reps) AS volume, count(*) AS sets
+    FROM performance_logs
+    WHERE logged_at >= :week_start
+        AND athlete_id IN (SELECT athlete_id FROM roster)
+    GROUP BY athlete_id
+)
+SELECT
+    u.id AS athlete_id, u.email, u.first_name, u.last_name,
+    (SELECT array_agg(DISTINCT program_id) FROM roster WHERE athlete_id = u.id) AS program_ids,
+    last_log.logged_at AS last_session,
+    COALESCE(weekly.volume, 0) AS weekly_volume,
+    COALESCE(weekly.sets, 0) AS weekly_sets,
+    COALESCE(adherence.prescribed, 0) AS prescribed,
+    COALESCE(adherence.completed, 0) AS completed,
+    latest_form.form_score,
+    latest_form.created_at AS form_scored_at
+FROM users u
+LEFT JOIN LATERAL (
+    SELECT logged_at FROM performance_logs
+    WHERE athlete_id = u.id
+    ORDER BY logged_at DESC
+    LIMIT 1
+) last_log ON true
+LEFT JOIN weekly ON weekly.athlete_id = u.id
+LEFT JOIN adherence ON adherence.athlete_id = u.id
+LEFT JOIN LATERAL (
+    SELECT form_score, created_at FROM form_analyses
+    WHERE athlete_id = u.id
+    ORDER BY created_at DESC
+    LIMIT 1
+) latest_form ON true
+WHERE u.id IN (SELECT athlete_id FROM roster)
+ORDER BY u.last_name, u.first_name, u.id
+"""
+
+def load_coach_dashboard(coach_id):
+    """Build the roster summary for a coach with a single query."""
+    rows = db.session.execute(text(DASHBOARD_SQL), {
+        'coach_id': coach_id,
+        'week_start': datetime.utcnow() - timedelta(days=7)
+    }).mappings().all()
+
+    athletes = []
+    for row in rows:
+        athletes.append({
+            'athlete_id': row['athlete_id'],
+            'email': row['email'],
+            'first_name': row['first_name'] or '',
+            'last_name': row['last_name'] or '',
+            'program_ids': sorted(row['program_ids'] or []),
+            'last_session': row['last_session'].isoformat() if row['last_session'] else None,
+            'weekly_volume': float(row['weekly_volume']),
+            'weekly_sets': row['weekly_sets'],
+            'adherence': round(row['completed'] / row['prescribed'] * 100, 1) if row['prescribed'] else None,
+            'latest_form_score': row['form_score'],
+            'form_scored_at': row['form_scored_at'].isoformat() if row['form_scored_at'] else None
+        })
+    return {
+        'coach_id': coach_id,
+        'generated_at': datetime.utcnow().isoformat(),
+        'athletes': athletes
+    }
+
+def get_coach_dashboard(coach_id):
+    """Get a coach's roster summary, cached for COACH_DASHBOARD_CACHE_SECONDS."""
+    key = f'coach_dashboard:{coach_id}'
+    ttl = current_app.config.get('COACH_DASHBOARD_CACHE_SECONDS', 60)
+
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = client.get(key)
+            if cached:
+                return json.loads(cached)
+        except RedisError as e:
+            logger.warning('Could not read dashboard cache: %s', str(e))
+    cached = _local_cache.get(coach_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    result = load_coach_dashboard(coach_id)
+
+    if client is not None:
+        try:
+            client.set(key, json.dumps(result), ex=ttl)
+        except RedisError as e:
+            logger.warning('Could not write dashboard cache: %s', str(e))
+    if len(_local_cache) >= current_app.config.get('COACH_DASHBOARD_LOCAL_CACHE_SIZE', 256):
+        _local_cache.clear()
+    _local_cache[coach_id] = (time.monotonic() + ttl, result)
+    return result
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+class PoolStats:
+    """Per-process counters for one connection pool."""
+
+    def __init__(self, sample_size=1000):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._samples = deque(maxlen=sample_size)
+
+    def start_wait(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, elapsed, success):
+        with self._lock:
+            self.waiting -= 1
+            if success:
+                self.in_use += 1
+                self.checkouts += 1
+                self.total_wait += elapsed
+                self.max_wait = max(self.max_wait, elapsed)
+                self._samples.append(elapsed)
+            else:
+                self.timeouts += 1
+
+    def returned(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self):
+        """Return the counters and checkout latency percentiles in milliseconds."""
+        with self._lock:
+            samples = sorted(self._samples)
+            data = {
+                'in_use': self.in_use,
+                'waiting': self.waiting,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'checkout_ms_avg': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0,
+                'checkout_ms_max': round(self.max_wait * 1000, 3)
+            }
+        for name, quantile in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            value = samples[min(int(len(samples) * quantile), len(samples) - 1)] if samples else 0
+            data[f'checkout_ms_{name}'] = round(value * 1000, 3)
+        return data
+
+class InstrumentedPoolMixin:
+    """Times every checkout (including queue wait) and tracks connections in use."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        stats = self.stats
+        stats.start_wait()
+        start = time.perf_counter()
+        success = False
+        try:
+            record = super()._do_get()
+            success = True
+            return record
+        finally:
+            stats.end_wait(time.perf_counter() - start, success)
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self.stats.returned()
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+def build_engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the pool settings in Config.
+
+    In PgBouncer transaction-pooling mode the application keeps no pool of
+    its own (PgBouncer does the pooling), and the statement timeout is set
+    per transaction because PgBouncer rejects startup options.
+    """
+    timeout_ms = config.get('DB_STATEMENT_TIMEOUT_MS')
+
+    if config.get('DB_PGBOUNCER_MODE'):
+        return {
+            'poolclass': InstrumentedNullPool,
+            'pool_pre_ping': False,
+        }
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('SQLALCHEMY_POOL_SIZE', 5),
+        'max_overflow': config.get('SQLALCHEMY_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('SQLALCHEMY_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('SQLALCHEMY_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('SQLALCHEMY_POOL_PRE_PING', True),
+    }
+    if timeout_ms:
+        options['connect_args'] = {'options': f'-c statement_timeout={int(timeout_ms)}'}
+    return options
+
+_transaction_timeout_ms = None
+
+def install_transaction_statement_timeout(timeout_ms):
+    """Apply statement_timeout with SET LOCAL at the start of every transaction."""
+    global _transaction_timeout_ms
+    first_install = _transaction_timeout_ms is None
+    _transaction_timeout_ms = int(timeout_ms)
+    if first_install:
+        event.listen(Engine, 'begin', _set_local_statement_timeout)
+
+def _set_local_statement_timeout(connection):
+    connection.exec_driver_sql(f'SET LOCAL statement_timeout = {_transaction_timeout_ms}')
+
+def pool_metrics(engines):
+    """Collect pool status and instrumentation for every engine in this process."""
+    metrics = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        data = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'idle': pool.checkedin()
+            })
+        if isinstance(pool, InstrumentedPoolMixin):
+            data.update(pool.stats.snapshot())
+        metrics[key or 'primary'] = data
+    return metrics
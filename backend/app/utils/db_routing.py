@@ -0,0 +1,198 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from redis.exceptions import RedisError
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = 'replica_'
+READ_METHODS = ('GET', 'HEAD')
+
+class ReplicaRouter:
+    """Chooses a healthy read replica engine, falling back to the primary.
+
+    Health is tracked per process: a replica that fails a ping or raises a
+    connection error is skipped for REPLICA_RETRY_SECONDS before it is
+    pinged again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._unhealthy_until = {}
+        self._checked_at = {}
+        self._instrumented = set()
+
+    def replica_keys(self, engines):
+        """Bind keys of the configured replica engines."""
+        return sorted(
+            key for key in engines
+            if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)
+        )
+
+    def mark_unhealthy(self, key):
+        """Skip a replica until its retry window has passed."""
+        retry = current_app.config.get('REPLICA_RETRY_SECONDS', 30)
+        with self._lock:
+            self._unhealthy_until[key] = time.monotonic() + retry
+        logger.warning('Read replica %s marked unhealthy for %ss', key, retry)
+
+    def is_healthy(self, key, engine):
+        """Check a replica, pinging it at most once per health check interval."""
+        now = time.monotonic()
+        if self._unhealthy_until.get(key, 0) > now:
+            return False
+
+        interval = current_app.config.get('REPLICA_HEALTH_CHECK_SECONDS', 10)
+        if now - self._checked_at.get(key, 0) < interval:
+            return True
+
+        with self._lock:
+            self._checked_at[key] = now
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            logger.warning('Read replica %s failed health check: %s', key, str(e))
+            self.mark_unhealthy(key)
+            return False
+        return True
+
+    def choose(self, engines):
+        """Return the engine serving this request's reads, or None for the primary."""
+        if 'replica_bind' in g:
+            key = g.replica_bind
+            return engines[key] if key else None
+
+        candidates = [key for key in self.replica_keys(engines) if self.is_healthy(key, engines[key])]
+        key = random.choice(candidates) if candidates else None
+        if key:
+            self._instrument(key, engines[key])
+        g.replica_bind = key
+        return engines[key] if key else None
+
+    def _instrument(self, key, engine):
+        """Mark a replica unhealthy as soon as it drops connections."""
+        if key in self._instrumented:
+            return
+        with self._lock:
+            if key in self._instrumented:
+                return
+
+            @event.listens_for(engine, 'handle_error')
+            def _on_error(context):
+                if context.is_disconnect:
+                    self.mark_unhealthy(key)
+
+            self._instrumented.add(key)
+
+replica_router = ReplicaRouter()
+
+# user_id -> pinned-until, used when Redis is unavailable
+_local_pins = {}
+
+def _pin_key(user_id):
+    return f'primary_pin:{user_id}'
+
+def pin_to_primary(user_id):
+    """Send this user's reads to the primary for the read-your-writes window."""
+    from app.utils.cache import get_redis
+
+    seconds = current_app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5)
+    client = get_redis()
+    if client is not None:
+        try:
+            client.set(_pin_key(user_id), 1, ex=seconds)
+            return
+        except RedisError as e:
+            logger.warning('Could not pin user %s to primary: %s', user_id, str(e))
+    _local_pins[user_id] = time.monotonic() + seconds
+
+def is_pinned_to_primary(user_id):
+    """Check whether a user wrote recently enough to need the primary."""
+    from app.utils.cache import get_redis
+
+    if _local_pins.get(user_id, 0) > time.monotonic():
+        return True
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        return bool(client.exists(_pin_key(user_id)))
+    except RedisError:
+        # Without the pin store we cannot guarantee read-your-writes
+        return True
+
+@contextmanager
+def primary_reads():
+    """Send the reads inside the block to the primary.
+
+    Used when filling caches shared by every request of a process or across
+    processes, which a lagging replica would otherwise seed with stale rows
+    under an already bumped version.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('force_primary', False)
+    g.force_primary = True
+    try:
+        yield
+    finally:
+        g.force_primary = previous
+
+def replica_allowed():
+    """Whether reads in the current context may go to a replica."""
+    if not has_request_context() or not current_app.config.get('SQLALCHEMY_BINDS'):
+        return False
+    if g.get('force_primary'):
+        return False
+    if request.method not in READ_METHODS:
+        return False
+    if request.blueprint not in current_app.config.get('REPLICA_BLUEPRINTS', ()):
+        return False
+
+    user = getattr(g, 'current_user', None)
+    if user is not None:
+        if 'pinned_to_primary' not in g:
+            g.pinned_to_primary = is_pinned_to_primary(user.id)
+        if g.pinned_to_primary:
+            return False
+    return True
+
+def is_read_statement(clause):
+    """Whether a statement is a plain read that a replica can serve."""
+    if clause is None:
+        return True
+    return bool(getattr(clause, 'is_select', False)) and getattr(clause, '_for_update_arg', None) is None
+
+@event.listens_for(Session, 'after_flush')
+def _track_writes(session, flush_context):
+    """Remember that this transaction wrote to the primary."""
+    session.info['wrote_to_primary'] = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement_writes(orm_execute_state):
+    """Core-style INSERT/UPDATE/DELETE through the session also count as writes."""
+    if not is_read_statement(orm_execute_state.statement):
+        orm_execute_state.session.info['wrote_to_primary'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _pin_writer(session):
+    """Pin the writing user to the primary once their write is committed."""
+    if not session.info.pop('wrote_to_primary', False):
+        return
+    if not has_request_context() or not current_app.config.get('SQLALCHEMY_BINDS'):
+        return
+    user = getattr(g, 'current_user', None)
+    if user is not None:
+        pin_to_primary(user.id)
+        g.pinned_to_primary = True
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_writes(session):
+    session.info.pop('wrote_to_primary', None)
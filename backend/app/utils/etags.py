@@ -0,0 +1,78 @@
+import hashlib
+from flask import make_response, request
+from sqlalchemy import text
+from app.database import db
+from app.utils.catalog import get_catalog
+
+# Newest change and row counts over a program and everything under it. Counts
+# catch deletions, which leave no newer updated_at behind.
+PROGRAM_VERSION_SQL = """
+SELECT
+    greatest(p.updated_at, max(w.updated_at), max(we.updated_at)) AS updated_at,
+    count(DISTINCT w.id) AS workouts,
+    count(we.id) AS exercises
+FROM programs p
+LEFT JOIN workouts w ON w.program_id = p.id
+LEFT JOIN workout_exercises we ON we.workout_id = w.id
+WHERE p.id = :id
+GROUP BY p.id
+"""
+
+WORKOUT_VERSION_SQL = """
+SELECT
+    greatest(w.updated_at, max(we.updated_at)) AS updated_at,
+    w.version,
+    count(we.id) AS exercises
+FROM workouts w
+LEFT JOIN workout_exercises we ON we.workout_id = w.id
+WHERE w.id = :id
+GROUP BY w.id
+"""
+
+def _etag(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+def program_etag(program_id, include_workouts=True):
+    """Strong ETag for a program payload, or None if the program does not exist.
+
+    Computed from entity versions with one aggregate query, never from the
+    serialized payload. Embedded exercises come from the catalog, so its
+    ETag is part of the key.
+    """
+    row = db.session.execute(text(PROGRAM_VERSION_SQL), {'id': program_id}).first()
+    if row is None:
+        return None
+    return _etag('program', program_id, include_workouts, *row, get_catalog().etag)
+
+def workout_etag(workout_id, include_exercises=True):
+    """Strong ETag for a workout payload, or None if the workout does not exist."""
+    row = db.session.execute(text(WORKOUT_VERSION_SQL), {'id': workout_id}).first()
+    if row is None:
+        return None
+    return _etag('workout', workout_id, include_exercises, *row, get_catalog().etag)
+
+def content_etag(kind, text):
+    """Strong ETag for a stored payload, derived from its content."""
+    return _etag(kind, hashlib.sha1(text.encode()).hexdigest())
+
+def exercise_etag(exercise):
+    """Strong ETag for one serialized catalog exercise."""
+    return _etag('exercise', exercise['id'], exercise.get('updated_at'))
+
+def not_modified(etag):
+    """Return a 304 response if the client already has this version, else None.
+
+    Uses the weak comparison of RFC 9110, since compressed responses carry
+    the weak form of the ETag.
+    """
+    if etag and request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def with_etag(response, etag):
+    """Attach an ETag and ask clients to revalidate before reusing the payload."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
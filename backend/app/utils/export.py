@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import zlib
+import pyarrow as pa
+import pyarrow.dataset as ds
+from sqlalchemy import select
+from app.database import db
+from app.models import PerformanceLog, WorkoutExercise
+from app.utils.archive import scan_batches
+from app.utils.catalog import get_catalog
+
+EXPORT_COLUMNS = (
+    'id', 'athlete_id', 'workout_id', 'workout_exercise_id', 'exercise_id', 'exercise_name',
+    'set_number', 'weight', 'reps', 'rpe', 'form_score', 'notes', 'logged_at'
+)
+
+def _format_row(row, catalog):
+    exercise = catalog.get(row['exercise_id'])
+    return {
+        'id': row['id'],
+        'athlete_id': row['athlete_id'],
+        'workout_id': row['workout_id'],
+        'workout_exercise_id': row['workout_exercise_id'],
+        'exercise_id': row['exercise_id'],
+        'exercise_name': exercise['name'] if exercise else None,
+        'set_number': row['set_number'],
+        'weight': float(row['weight']) if row['weight'] is not None else None,
+        'reps': row['reps'],
+        'rpe': float(row['rpe']) if row['rpe'] is not None else None,
+        'form_score': row['form_score'],
+        'notes': row['notes'],
+        'logged_at': row['logged_at'].isoformat() if row['logged_at'] else None
+    }
+
+def export_batches(athlete_ids, exercise_id=None, date_from=None, date_to=None, batch_size=1000):
+    """Yield an export of athletes' performance logs in batches of formatted rows.
+
+    Live rows are read through a server-side cursor (yield_per), so memory
+    stays constant however large the export is; each athlete's archived rows
+    follow, read batch by batch from cold storage.
+    """
+    catalog = get_catalog()
+    statement = select(
+        PerformanceLog.id,
+        PerformanceLog.athlete_id,
+        WorkoutExercise.workout_id,
+        PerformanceLog.workout_exercise_id,
+        WorkoutExercise.exercise_id,
+        PerformanceLog.set_number,
+        PerformanceLog.weight,
+        PerformanceLog.reps,
+        PerformanceLog.rpe,
+        PerformanceLog.form_score,
+        PerformanceLog.notes,
+        PerformanceLog.logged_at
+    ).join(
+        WorkoutExercise, WorkoutExercise.id == PerformanceLog.workout_exercise_id
+    ).where(
+        PerformanceLog.athlete_id.in_(athlete_ids)
+    )
+    if exercise_id:
+        statement = statement.where(WorkoutExercise.exercise_id == exercise_id)
+    if date_from:
+        statement = statement.where(PerformanceLog.logged_at >= date_from)
+    if date_to:
+        statement = statement.where(PerformanceLog.logged_at < date_to)
+    statement = statement.order_by(
+        PerformanceLog.athlete_id, PerformanceLog.logged_at, PerformanceLog.id
+    ).execution_options(yield_per=batch_size)
+
+    result = db.session.execute(statement)
+    for partition in result.mappings().partitions():
+        yield [_format_row(row, catalog) for row in partition]
+
+    conditions = []
+    if exercise_id:
+        conditions.append(ds.field('exercise_id') == exercise_id)
+    if date_from:
+        conditions.append(ds.field('logged_at') >= pa.scalar(date_from, type=pa.timestamp('us')))
+    if date_to:
+        conditions.append(ds.field('logged_at') < pa.scalar(date_to, type=pa.timestamp('us')))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    archived_columns = [name for name in EXPORT_COLUMNS if name != 'exercise_name']
+    for athlete_id in athlete_ids:
+        for batch in scan_batches('performance_logs', athlete_id, archived_columns, expression, batch_size):
+            yield [_format_row(row, catalog) for row in batch]
+
+def ndjson_chunks(batches):
+    """Encode row batches as newline-delimited JSON."""
+    for batch in batches:
+        yield ''.join(json.dumps(row) + '\n' for row in batch).encode()
+
+def csv_chunks(batches):
+    """Encode row batches as CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,354 @@
+import csv
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from celery import shared_task
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import insert, select
+from app.database import db
+from app.models import User, Program, AthleteProgram, Workout, WorkoutExercise, PersonalRecord
+from app.utils.analytics import mark_history_changed
+from app.utils.cache import get_redis
+from app.utils.catalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+# Imported sets hang off one shared workout, with a workout exercise per exercise
+IMPORT_WORKOUT_NAME = 'Imported history'
+
+COPY_COLUMNS = (
+    'athlete_id', 'workout_exercise_id', 'set_number', 'weight', 'reps', 'rpe',
+    'notes', 'logged_at', 'created_at', 'updated_at'
+)
+COPY_SQL = f"COPY performance_logs ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+class ImportStats:
+    """Counters and rejected rows for one import run."""
+
+    def __init__(self, max_rejects=1000):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []
+        self.max_rejects = max_rejects
+
+    def reject(self, line, error):
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects:
+            self.rejects.append({'line': line, 'error': error})
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'rejects': self.rejects,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.imported / elapsed, 1) if elapsed else 0
+        }
+
+# Bounds of the performance_logs columns: weight Numeric(10, 2), rpe
+# Numeric(3, 1) on the 0-10 scale, reps and set_number integer
+MAX_WEIGHT = Decimal('99999999.99')
+MAX_RPE = Decimal('10')
+MAX_INTEGER = 2 ** 31 - 1
+
+def _parse_number(value, cast, field, minimum, maximum):
+    """Parse an optional number, rejecting NaN, infinities and out-of-range values."""
+    if value is None or value.strip() == '':
+        return None
+    try:
+        number = cast(value.strip())
+    except (ValueError, ArithmeticError):
+        raise ValueError(f'Invalid {field}: {value!r}')
+    if isinstance(number, Decimal) and not number.is_finite():
+        raise ValueError(f'Invalid {field}: {value!r}')
+    if not minimum <= number <= maximum:
+        raise ValueError(f'{field} out of range ({minimum} to {maximum}): {value!r}')
+    return number
+
+def _parse_decimal(value, places):
+    # Rounded like Postgres rounds numeric input to the column scale
+    return Decimal(value).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+def parse_row(row, catalog, set_numbers):
+    """Validate one CSV row.
+
+    Expected columns are exercise, date (or logged_at), weight and reps,
+    with optional set_number, rpe, notes and athlete_email.
+
+    Returns:
+        dict: Parsed set with exercise_id and athlete_email
+
+    Raises:
+        ValueError: If the row cannot be imported.
+    """
+    exercise_id = catalog.id_for_name(row.get('exercise'))
+    if exercise_id is None:
+        raise ValueError(f"Unknown exercise: {row.get('exercise')!r}")
+
+    raw_date = row.get('logged_at') or row.get('date')
+    if not raw_date:
+        raise ValueError('Missing date')
+    try:
+        logged_at = datetime.fromisoformat(raw_date.strip())
+    except ValueError:
+        raise ValueError(f'Invalid date: {raw_date!r}')
+
+    reps = _parse_number(row.get('reps'), int, 'reps', 0, MAX_INTEGER)
+    if reps is None:
+        raise ValueError('Missing reps')
+    weight = _parse_number(row.get('weight'), lambda v: _parse_decimal(v, 2), 'weight', 0, MAX_WEIGHT)
+    rpe = _parse_number(row.get('rpe'), lambda v: _parse_decimal(v, 1), 'rpe', 0, MAX_RPE)
+
+    athlete_email = (row.get('athlete_email') or '').strip().lower() or None
+    set_number = _parse_number(row.get('set_number'), int, 'set_number', 1, MAX_INTEGER)
+    if set_number is None:
+        # Number sets in file order per athlete, exercise and day
+        key = (athlete_email, exercise_id, logged_at.date())
+        set_numbers[key] = set_number = set_numbers.get(key, 0) + 1
+
+    return {
+        'athlete_email': athlete_email,
+        'exercise_id': exercise_id,
+        'set_number': set_number,
+        'weight': weight,
+        'reps': reps,
+        'rpe': rpe,
+        'notes': (row.get('notes') or '').strip() or None,
+        'logged_at': logged_at
+    }
+
+def import_workout_exercises(exercise_ids, known):
+    """Map exercise IDs to workout exercises of the import workout, creating missing ones.
+
+    Args:
+        exercise_ids (set): Exercises referenced by the current batch
+        known (dict): exercise_id -> workout_exercise_id, updated in place
+    """
+    missing = set(exercise_ids) - set(known)
+    if not missing:
+        return known
+
+    workout_id = db.session.execute(
+        select(Workout.id).where(Workout.name == IMPORT_WORKOUT_NAME, Workout.program_id.is_(None))
+    ).scalar()
+    if workout_id is None:
+        workout_id = db.session.execute(
+            insert(Workout).values(
+                name=IMPORT_WORKOUT_NAME,
+                notes='Sets loaded with import_history',
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            ).returning(Workout.id)
+        ).scalar()
+
+    known.update(db.session.execute(
+        select(WorkoutExercise.exercise_id, WorkoutExercise.id).where(
+            WorkoutExercise.workout_id == workout_id,
+            WorkoutExercise.exercise_id.in_(missing)
+        )
+    ).all())
+    missing -= set(known)
+    if missing:
+        now = datetime.utcnow()
+        rows = db.session.execute(
+            insert(WorkoutExercise).returning(WorkoutExercise.exercise_id, WorkoutExercise.id),
+            [
+                {'workout_id': workout_id, 'exercise_id': exercise_id, 'sets': 0,
+                 'order_index': exercise_id, 'created_at': now, 'updated_at': now}
+                for exercise_id in sorted(missing)
+            ]
+        ).all()
+        known.update(rows)
+    return known
+
+def _copy_batch(batch):
+    """Load a batch of parsed sets with COPY on the session's connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    now = datetime.utcnow().isoformat()
+    for item in batch:
+        writer.writerow([
+            item['athlete_id'], item['workout_exercise_id'], item['set_number'],
+            item['weight'], item['reps'], item['rpe'], item['notes'],
+            item['logged_at'].isoformat(), now, now
+        ])
+    buffer.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(COPY_SQL, buffer)
+    finally:
+        cursor.close()
+
+def import_history(stream, athlete_id=None, batch_size=None, progress=None, allowed_athlete_ids=None):
+    """Import historical sets from a CSV stream with batched COPY.
+
+    The file is parsed row by row; every batch resolves its athletes with one
+    query and its workout exercises with at most one insert, is loaded with
+    COPY and committed. Personal records and analytics are refreshed for the
+    imported athletes at the end.
+
+    Args:
+        stream: Text stream of CSV data with a header row
+        athlete_id (int, optional): Athlete for rows without an athlete_email
+        batch_size (int, optional): Rows per COPY, default IMPORT_BATCH_SIZE
+        progress (callable, optional): Called with the stats after each batch
+        allowed_athlete_ids (set, optional): Athletes rows may be written for;
+            rows naming anyone else are rejected. None allows every athlete,
+            which only trusted callers such as manage.py should pass.
+
+    Returns:
+        ImportStats: Counts, rows per second and rejected rows
+    """
+    batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 5000)
+    stats = ImportStats(current_app.config.get('IMPORT_MAX_REJECTS', 1000))
+    catalog = get_catalog()
+    set_numbers = {}
+    athletes = {}
+    workout_exercises = {}
+    imported_athletes = set()
+
+    def flush(batch):
+        emails = {item['athlete_email'] for item in batch if item['athlete_email']} - set(athletes)
+        if emails:
+            athletes.update({email: None for email in emails})
+            athletes.update(db.session.execute(
+                select(db.func.lower(User.email), User.id).where(
+                    db.func.lower(User.email).in_(emails),
+                    User.role == 'athlete'
+                )
+            ).all())
+
+        rows = []
+        for line, item in batch:
+            target = athletes.get(item['athlete_email']) if item['athlete_email'] else athlete_id
+            if target is None:
+                stats.reject(line, f"Unknown athlete: {item['athlete_email'] or 'none given'}")
+                continue
+            if allowed_athlete_ids is not None and target not in allowed_athlete_ids:
+                stats.reject(line, f"Not allowed to import for athlete: {item['athlete_email']}")
+                continue
+            item['athlete_id'] = target
+            rows.append(item)
+        if not rows:
+            return
+
+        try:
+            import_workout_exercises({item['exercise_id'] for item in rows}, workout_exercises)
+            for item in rows:
+                item['workout_exercise_id'] = workout_exercises[item['exercise_id']]
+            _copy_batch(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        stats.imported += len(rows)
+        imported_athletes.update(item['athlete_id'] for item in rows)
+
+    reader = csv.DictReader(stream)
+    batch = []
+    for row in reader:
+        stats.rows += 1
+        try:
+            item = parse_row({(k or '').strip().lower(): v for k, v in row.items()}, catalog, set_numbers)
+        except ValueError as e:
+            stats.reject(reader.line_num, str(e))
+            continue
+        batch.append((reader.line_num, item))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+            if progress:
+                progress(stats)
+    if batch:
+        flush(batch)
+
+    if imported_athletes:
+        for imported_id in imported_athletes:
+            mark_history_changed(db.session, imported_id)
+        PersonalRecord.backfill(sorted(imported_athletes))
+    if progress:
+        progress(stats)
+    return stats
+
+def _status_key(job_id):
+    return f'import_job:{job_id}'
+
+def set_import_status(job_id, status, **data):
+    """Store the status of an async import for IMPORT_STATUS_SECONDS."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.set(
+            _status_key(job_id),
+            json.dumps(dict(data, job_id=job_id, status=status)),
+            ex=current_app.config.get('IMPORT_STATUS_SECONDS', 86400)
+        )
+    except RedisError as e:
+        logger.warning('Could not store import status %s: %s', job_id, str(e))
+
+class ImportStatusUnavailable(Exception):
+    """Raised when import statuses cannot be read because Redis is down."""
+
+def get_import_status(job_id):
+    """Get the stored status of an async import, or None if unknown.
+
+    Raises:
+        ImportStatusUnavailable: If Redis is unavailable.
+    """
+    client = get_redis()
+    if client is None:
+        raise ImportStatusUnavailable()
+    try:
+        cached = client.get(_status_key(job_id))
+    except RedisError as e:
+        logger.warning('Could not read import status %s: %s', job_id, str(e))
+        raise ImportStatusUnavailable()
+    return json.loads(cached) if cached else None
+
+def importable_athlete_ids(user_id, athlete_id):
+    """Athletes an uploaded file may write sets for.
+
+    The job's own athlete, plus, for a coach, every athlete on one of their
+    programs; athletes can only import for themselves.
+    """
+    allowed = {athlete_id}
+    role = db.session.execute(select(User.role).where(User.id == user_id)).scalar()
+    if role == 'coach':
+        allowed.update(db.session.execute(
+            select(AthleteProgram.athlete_id).join(
+                Program, Program.id == AthleteProgram.program_id
+            ).where(Program.coach_id == user_id)
+        ).scalars())
+    return allowed
+
+@shared_task
+def import_history_file(job_id, path, athlete_id, user_id):
+    """Run an uploaded import in the background, reporting progress to Redis."""
+    def progress(stats):
+        set_import_status(job_id, 'running', user_id=user_id, **stats.to_dict())
+
+    set_import_status(job_id, 'running', user_id=user_id)
+    try:
+        allowed = importable_athlete_ids(user_id, athlete_id)
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            stats = import_history(
+                stream, athlete_id=athlete_id, progress=progress, allowed_athlete_ids=allowed
+            )
+        set_import_status(job_id, 'completed', user_id=user_id, **stats.to_dict())
+    except Exception as e:
+        logger.error('Import %s failed: %s', job_id, str(e))
+        set_import_status(job_id, 'failed', user_id=user_id, error=str(e))
+        raise
+    finally:
+        os.remove(path)
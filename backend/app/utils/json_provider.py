@@ -0,0 +1,111 @@
+import dataclasses
+import json
+import logging
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import Response
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Streamed responses are flushed in chunks of about this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def _default(obj):
+    """Serialize the types the API returns that JSON has no native form for."""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, 'tolist'):
+        # NumPy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+class StdlibJSONProvider(JSONProvider):
+    """The json module, with datetime, Decimal and NumPy support.
+
+    Dates are ISO 8601 like the to_dict() payloads, rather than Flask's
+    HTTP-date default, so both providers produce the same output.
+    """
+
+    sort_keys = True
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def dumps_bytes(self, obj):
+        return self.dumps(obj).encode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
+
+class OrjsonProvider(StdlibJSONProvider):
+    """orjson, which serializes datetimes and NumPy arrays natively in C."""
+
+    def _options(self):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for json.dumps options get the stdlib encoder
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=self._options())
+
+JSON_PROVIDERS = {
+    'stdlib': StdlibJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+def init_json_provider(app):
+    """Install the JSON_PROVIDER from Config, falling back to stdlib without orjson."""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name == 'orjson' and orjson is None:
+        logger.warning('orjson is not installed; using the stdlib JSON provider')
+        name = 'stdlib'
+    app.json = JSON_PROVIDERS[name](app)
+
+def stream_json_text(text, head='', tail=''):
+    """Send already encoded JSON text in chunks of STREAM_CHUNK_BYTES.
+
+    Large stored payloads (pose data) go out as Postgres returned them,
+    without being decoded into Python objects and encoded again.
+    """
+    yield head.encode()
+    for start in range(0, len(text), STREAM_CHUNK_BYTES):
+        yield text[start:start + STREAM_CHUNK_BYTES].encode()
+    yield tail.encode()
+
+def json_stream_response(chunks, status=200):
+    """Wrap encoded JSON chunks in a streamed response."""
+    return Response(chunks, status=status, mimetype='application/json')
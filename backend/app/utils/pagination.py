@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request, current_app
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values):
+    """Encode a list of sort key values into an opaque cursor string."""
+    payload = [
+        value.isoformat() if isinstance(value, (datetime, date)) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor string back into typed sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the sort keys.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            elif value is not None and python_type is int and type(value) is not int:
+                raise TypeError(value)
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+
+def get_page_limit():
+    """Read the requested page size from the query string, clamped to the configured maximum."""
+    default = current_app.config.get('PAGINATION_DEFAULT_LIMIT', 50)
+    maximum = current_app.config.get('PAGINATION_MAX_LIMIT', 200)
+    limit = request.args.get('limit', default, type=int)
+    return max(1, min(limit, maximum))
+
+
+def paginate(query, columns, descending=False):
+    """Apply keyset pagination to a query using the request's cursor and limit.
+
+    The sort key must be unique (end it with the primary key) and non-null so
+    that the row-value comparison against the cursor is stable and can be
+    served by a matching composite index, regardless of page depth.
+
+    Args:
+        query: SQLAlchemy query to paginate
+        columns (list): Model columns forming the sort key, e.g. [logged_at, id]
+        descending (bool): Sort newest/largest first
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the supplied cursor is invalid.
+    """
+    limit = get_page_limit()
+    cursor = request.args.get('cursor')
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(None).order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+    return rows, next_cursor
@@ -0,0 +1,90 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated; respond 503 and retry later."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__('Password hashing is at capacity')
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('PASSWORD_HASH_WORKERS', 2),
+                    thread_name_prefix='password-hash'
+                )
+    return _executor
+
+def _run(fn, *args):
+    """Run a hashing call on the pool, refusing work beyond PASSWORD_HASH_MAX_PENDING.
+
+    hashlib releases the GIL while hashing, so other requests in this
+    worker keep being served while a hash is computed.
+    """
+    global _pending
+    config = current_app.config
+    retry_after = config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+    with _pending_lock:
+        if _pending >= config.get('PASSWORD_HASH_MAX_PENDING', 32):
+            raise HashingBusy(retry_after)
+        _pending += 1
+
+    def task():
+        global _pending
+        try:
+            return fn(*args)
+        finally:
+            with _pending_lock:
+                _pending -= 1
+
+    future = _get_executor().submit(task)
+    try:
+        return future.result(timeout=config.get('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+    except FutureTimeoutError:
+        logger.warning('Password hashing timed out with %s pending', _pending)
+        raise HashingBusy(retry_after)
+
+def hash_method():
+    return current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+
+def hash_password(password):
+    """Hash a password with PASSWORD_HASH_METHOD on the hashing pool."""
+    return _run(generate_password_hash, password, hash_method())
+
+def needs_rehash(password_hash):
+    """Whether a stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+    return password_hash.split('$', 1)[0] != hash_method()
+
+def verify_password(user, password):
+    """Check a user's password on the hashing pool, upgrading outdated hashes.
+
+    When the password matches but the stored hash uses older parameters,
+    the user's hash is replaced with one made with PASSWORD_HASH_METHOD;
+    the caller commits it.
+
+    Returns:
+        tuple: (matches, upgraded)
+
+    Raises:
+        HashingBusy: If the hashing pool is saturated.
+    """
+    if not _run(check_password_hash, user.password_hash, password):
+        return False, False
+    if not needs_rehash(user.password_hash):
+        return True, False
+    user.password_hash = hash_password(password)
+    return True, True
@@ -0,0 +1,137 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Expanded IN lists render one placeholder per value; collapse them so the
+# same query with a different number of IDs has one fingerprint.
+_IN_LIST = re.compile(r'\((?:\s*%\(\w+\)s\s*,?)+\)')
+_WHITESPACE = re.compile(r'\s+')
+
+class NPlusOneError(Exception):
+    """Raised when N_PLUS_ONE_RAISE is set and a request repeats a statement too often."""
+
+    def __init__(self, endpoint, fingerprint, count):
+        self.endpoint = endpoint
+        self.fingerprint = fingerprint
+        self.count = count
+        super().__init__(f'{endpoint} ran the same statement {count} times: {fingerprint}')
+
+def fingerprint(statement):
+    """Normalize a parameterized statement so repeated executions compare equal."""
+    return _IN_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+class RequestQueryStats:
+    """Statements executed while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def most_repeated(self):
+        """Return (fingerprint, count) of the most repeated statement, or (None, 0)."""
+        if not self.fingerprints:
+            return None, 0
+        return self.fingerprints.most_common(1)[0]
+
+class QueryMetrics:
+    """Per-process query counts and DB time aggregated by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def observe(self, endpoint, stats, flagged):
+        with self._lock:
+            data = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'db_time': 0.0, 'max_queries': 0, 'n_plus_one': 0
+            })
+            data['requests'] += 1
+            data['queries'] += stats.count
+            data['db_time'] += stats.total_time
+            data['max_queries'] = max(data['max_queries'], stats.count)
+            data['n_plus_one'] += int(flagged)
+
+    def snapshot(self):
+        """Return per-endpoint averages, DB time in milliseconds."""
+        with self._lock:
+            endpoints = {name: dict(data) for name, data in self._endpoints.items()}
+        return {
+            name: {
+                'requests': data['requests'],
+                'queries_avg': round(data['queries'] / data['requests'], 2),
+                'queries_max': data['max_queries'],
+                'db_ms_avg': round(data['db_time'] / data['requests'] * 1000, 3),
+                'n_plus_one': data['n_plus_one']
+            }
+            for name, data in sorted(endpoints.items())
+        }
+
+query_metrics = QueryMetrics()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_stats' in g:
+        context._query_start_time = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or 'query_stats' not in g:
+        return
+    started = getattr(context, '_query_start_time', None)
+    if started is not None:
+        g.query_stats.record(statement, time.perf_counter() - started)
+
+def init_query_stats(app):
+    """Count the statements each request runs and flag repeated ones.
+
+    Every request gets a statement count, total DB time and a count per
+    statement fingerprint. With QUERY_STATS_HEADERS the numbers are sent
+    back as response headers; they are always aggregated per endpoint for
+    /api/v1/health/queries. A request that runs one fingerprint more than
+    N_PLUS_ONE_THRESHOLD times is logged, or fails with NPlusOneError when
+    N_PLUS_ONE_RAISE is set (as in tests).
+    """
+
+    @app.before_request
+    def _start_query_stats():
+        g.query_stats = RequestQueryStats()
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+        statement, repeated = stats.most_repeated()
+        flagged = bool(threshold) and repeated > threshold
+        query_metrics.observe(endpoint, stats, flagged)
+
+        if current_app.config.get('QUERY_STATS_HEADERS'):
+            db_ms = round(stats.total_time * 1000, 3)
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-Query-Time-Ms'] = str(db_ms)
+            response.headers['X-Query-Max-Repeat'] = str(repeated)
+            response.headers['Server-Timing'] = f'db;dur={db_ms};desc="{stats.count} queries"'
+
+        if flagged:
+            if current_app.config.get('N_PLUS_ONE_RAISE'):
+                raise NPlusOneError(endpoint, statement, repeated)
+            logger.warning(
+                'Possible N+1 in %s: statement ran %s times: %s', endpoint, repeated, statement
+            )
+        return response
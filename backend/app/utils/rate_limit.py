@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, jsonify, request
+from redis.exceptions import RedisError
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket for the time elapsed since its last use, then takes one
+# token if available. Returns {allowed, milliseconds until a token is free}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+local wait_ms = 0
+if allowed == 0 then
+    wait_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+return {allowed, wait_ms}
+"""
+
+_script = None
+
+# key -> [tokens, updated], least recently used first; used when Redis is unavailable
+_local_buckets = OrderedDict()
+_local_lock = threading.Lock()
+LOCAL_BUCKET_LIMIT = 10000
+
+# Monotonic time until which Redis is skipped after an error
+_redis_retry_at = 0
+
+# X-Request-Start values outside this window are ignored as bogus
+QUEUE_LATENCY_MAX_SKEW_SECONDS = 60
+QUEUE_LATENCY_MAX_SECONDS = 3600
+
+# Health checks and CORS preflights are never limited
+EXEMPT_BLUEPRINTS = ('health',)
+
+def route_class(endpoint):
+    """Rate-limit class of an endpoint, from RATE_LIMIT_ROUTE_CLASSES."""
+    return current_app.config.get('RATE_LIMIT_ROUTE_CLASSES', {}).get(endpoint, 'default')
+
+def client_identity():
+    """Authenticated user from the bearer token, else the client address.
+
+    The token is only decoded, not looked up, so limiting adds no query.
+    """
+    from app.utils.auth import decode_token
+
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.lower().startswith('bearer '):
+        payload = decode_token(auth_header.split(None, 1)[1])
+        if payload and payload.get('user_id'):
+            return f"user:{payload['user_id']}"
+    return f'ip:{request.remote_addr}'
+
+def auth_identity():
+    """Client address plus the email being tried, for login and registration.
+
+    Users behind one shared address, such as a gym's wifi, do not use up
+    each other's attempts, while guessing at one account from an address
+    stays limited.
+    """
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email.strip():
+        return f'ip:{request.remote_addr}'
+    digest = hashlib.sha1(email.strip().lower().encode()).hexdigest()[:16]
+    return f'ip:{request.remote_addr}:email:{digest}'
+
+def _take_redis(client, key, capacity, rate):
+    global _script
+    if _script is None:
+        _script = client.register_script(TOKEN_BUCKET_LUA)
+    allowed, wait_ms = _script(keys=[key], args=[capacity, rate])
+    return bool(allowed), int(wait_ms) / 1000
+
+def _take_local(key, capacity, rate):
+    now = time.monotonic()
+    with _local_lock:
+        tokens, updated = _local_buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        _local_buckets[key] = (tokens, now)
+        while len(_local_buckets) > LOCAL_BUCKET_LIMIT:
+            _local_buckets.popitem(last=False)
+    return allowed, 0 if allowed else (1 - tokens) / rate
+
+def take_token(key, capacity, rate):
+    """Take one token from a bucket, in Redis when available.
+
+    After a Redis error, buckets are kept locally for
+    RATE_LIMIT_REDIS_RETRY_SECONDS before Redis is tried again.
+
+    Args:
+        key (str): Bucket key
+        capacity (int): Burst size
+        rate (float): Tokens refilled per second
+
+    Returns:
+        tuple: (allowed, seconds until a token is available)
+    """
+    global _redis_retry_at
+    client = get_redis() if time.monotonic() >= _redis_retry_at else None
+    if client is not None:
+        try:
+            return _take_redis(client, key, capacity, rate)
+        except RedisError as e:
+            # Skip Redis for a while rather than paying its timeout on every request
+            retry = current_app.config.get('RATE_LIMIT_REDIS_RETRY_SECONDS', 5)
+            _redis_retry_at = time.monotonic() + retry
+            logger.warning('Rate limiting on local buckets for %ss: %s', retry, str(e))
+    return _take_local(key, capacity, rate)
+
+def queue_latency():
+    """Seconds the request waited before reaching the app, from X-Request-Start.
+
+    Accepts the proxy formats 't=<seconds>' and seconds, milliseconds or
+    microseconds since the epoch. Returns None without the header, or when
+    it is not a plausible timestamp (not finite, in the future beyond
+    clock skew, or older than QUEUE_LATENCY_MAX_SECONDS).
+    """
+    raw = request.headers.get('X-Request-Start', '').strip()
+    if raw.startswith('t='):
+        raw = raw[2:]
+    try:
+        started = float(raw)
+    except ValueError:
+        return None
+    if not math.isfinite(started):
+        return None
+    # Normalize microseconds and milliseconds to seconds
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    waited = time.time() - started
+    if waited < -QUEUE_LATENCY_MAX_SKEW_SECONDS or waited > QUEUE_LATENCY_MAX_SECONDS:
+        return None
+    return max(waited, 0)
+
+def _too_many(message, retry_after):
+    response = jsonify({'error': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(math.ceil(retry_after), 1))
+    return response
+
+def init_rate_limiting(app):
+    """Shed requests that queued too long and rate limit the rest.
+
+    Requests whose X-Request-Start shows more than RATE_LIMIT_SHED_QUEUE_MS
+    of queueing are answered with 429 straight away; the client has likely
+    given up, and serving it would only delay the requests behind it.
+    Everything else takes a token from the bucket of its client and route
+    class, sized by RATE_LIMITS.
+    """
+
+    @app.before_request
+    def _limit_request():
+        config = current_app.config
+        if not config.get('RATE_LIMIT_ENABLED') or request.method == 'OPTIONS':
+            return None
+        if request.blueprint in EXEMPT_BLUEPRINTS:
+            return None
+
+        shed_ms = config.get('RATE_LIMIT_SHED_QUEUE_MS')
+        if shed_ms:
+            waited = queue_latency()
+            if waited is not None and waited * 1000 > shed_ms:
+                logger.warning('Shedding %s after %.0f ms in queue', request.path, waited * 1000)
+                return _too_many('Server is busy, please retry shortly', config.get('RATE_LIMIT_SHED_RETRY_AFTER', 1))
+
+        limit_class = route_class(request.endpoint)
+        limits = config.get('RATE_LIMITS', {})
+        limit = limits.get(limit_class) or limits.get('default')
+        if not limit:
+            return None
+        capacity, rate = limit
+        if limit_class == 'auth':
+            # Per email and address, plus a wider per-address bucket so one
+            # address spraying a password across many accounts is still limited
+            address_limit = limits.get('auth_address')
+            if address_limit:
+                allowed, retry_after = take_token(
+                    f'rate:auth_address:ip:{request.remote_addr}', *address_limit
+                )
+                if not allowed:
+                    return _too_many('Too many requests', retry_after)
+            identity = auth_identity()
+        else:
+            identity = client_identity()
+        allowed, retry_after = take_token(f'rate:{limit_class}:{identity}', capacity, rate)
+        if not allowed:
+            return _too_many('Too many requests', retry_after)
+        return None
@@ -0,0 +1,160 @@
+from flask import request
+from sqlalchemy.orm import load_only
+from app.models import PerformanceLog, Workout, WorkoutExercise, User, Exercise
+
+def isoformat(value):
+    """Format a date or datetime as ISO 8601, passing None through."""
+    return value.isoformat() if value else None
+
+class Serializer:
+    """Field-level serializer shared by list endpoints.
+
+    Clients pick a sparse fieldset with ?fields=a,b,c. The same selection
+    is pushed down into SQL with load_only, so unrequested columns are
+    neither read from the database nor sent over the wire. The primary key
+    is always included.
+
+    Args:
+        model: Mapped model class
+        columns (tuple): Column attributes that may be requested
+        computed (dict, optional): Derived fields, name -> (function(obj),
+            tuple of the columns it reads)
+        formatters (dict, optional): Per-field output formatters
+        default (tuple, optional): Fields returned when none are requested;
+            defaults to every column and computed field
+    """
+
+    def __init__(self, model, columns, computed=None, formatters=None, default=None):
+        self.model = model
+        self.columns = tuple(columns)
+        self.computed = computed or {}
+        self.formatters = formatters or {}
+        self.default = tuple(default) if default else self.columns + tuple(self.computed)
+
+    @property
+    def available(self):
+        return self.columns + tuple(self.computed)
+
+    def parse_fields(self, raw=None):
+        """Parse a comma-separated field list, by default from ?fields=.
+
+        Returns:
+            tuple: The requested fields, or the default fieldset if none were given
+
+        Raises:
+            ValueError: If an unknown field is requested.
+        """
+        if raw is None:
+            raw = request.args.get('fields')
+        requested = [name.strip() for name in (raw or '').split(',') if name.strip()]
+        if not requested:
+            return self.default
+
+        unknown = [name for name in requested if name not in self.available]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if 'id' not in requested:
+            requested.insert(0, 'id')
+        return tuple(dict.fromkeys(requested))
+
+    def columns_for(self, fields):
+        """Model columns that must be loaded to serialize the given fields."""
+        names = set()
+        for name in fields:
+            if name in self.computed:
+                names.update(self.computed[name][1])
+            else:
+                names.add(name)
+        return [getattr(self.model, name) for name in self.columns if name in names]
+
+    def apply(self, query, fields, *extra):
+        """Restrict a query to the columns needed for the fields.
+
+        Args:
+            query: Query over the serializer's model
+            fields (tuple): Fields from parse_fields
+            *extra: Further columns the caller reads, e.g. the pagination key
+        """
+        columns = self.columns_for(fields)
+        columns.extend(column for column in extra if column not in columns)
+        return query.options(load_only(*columns))
+
+    def dump(self, obj, fields=None):
+        """Serialize one model instance."""
+        data = {}
+        for name in fields or self.default:
+            if name in self.computed:
+                value = self.computed[name][0](obj)
+            else:
+                value = getattr(obj, name)
+            formatter = self.formatters.get(name)
+            data[name] = formatter(value) if formatter else value
+        return data
+
+    def dump_all(self, objs, fields=None):
+        """Serialize a list of model instances."""
+        return [self.dump(obj, fields) for obj in objs]
+
+    def project(self, data, fields):
+        """Apply a sparse fieldset to an already serialized dictionary."""
+        if fields == self.default:
+            return data
+        return {name: data[name] for name in fields if name in data}
+
+
+def workout_exercises(workout):
+    """Serialize a workout's exercises in order."""
+    return [
+        exercise.to_dict()
+        for exercise in workout.exercises.order_by(WorkoutExercise.order_index).all()
+    ]
+
+performance_log_serializer = Serializer(
+    PerformanceLog,
+    columns=(
+        'id', 'athlete_id', 'workout_exercise_id', 'set_number', 'weight', 'reps', 'rpe',
+        'video_url', 'notes', 'logged_at', 'form_score', 'created_at', 'updated_at'
+    ),
+    computed={
+        'volume': (PerformanceLog.calculate_volume, ('weight', 'reps')),
+    }
+)
+
+workout_serializer = Serializer(
+    Workout,
+    columns=(
+        'id', 'name', 'program_id', 'description', 'day_number', 'notes', 'version',
+        'created_at', 'updated_at'
+    ),
+    computed={
+        'exercises': (workout_exercises, ()),
+    },
+    formatters={
+        'created_at': isoformat,
+        'updated_at': isoformat,
+    }
+)
+
+user_serializer = Serializer(
+    User,
+    columns=('id', 'email', 'role', 'first_name', 'last_name'),
+    computed={
+        'full_name': (
+            lambda user: user.full_name if (user.first_name or user.last_name) else user.email,
+            ('first_name', 'last_name', 'email')
+        ),
+    },
+    formatters={
+        'first_name': lambda value: value or '',
+        'last_name': lambda value: value or '',
+    }
+)
+
+# Exercises are served from the catalog snapshot, so only project() is used
+exercise_serializer = Serializer(
+    Exercise,
+    columns=(
+        'id', 'name', 'type', 'description', 'video_url', 'muscles_worked',
+        'created_at', 'updated_at'
+    )
+)
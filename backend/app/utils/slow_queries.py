@@ -0,0 +1,167 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app, has_app_context, has_request_context, request
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.cache import get_redis
+from app.utils.query_stats import fingerprint
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = 'slow_queries'
+# EXPLAIN ANALYZE executes the statement, so only plain reads are explained
+_WRITES = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE)\b', re.IGNORECASE)
+# Pending EXPLAIN captures per process; further samples are dropped
+MAX_PENDING_EXPLAINS = 4
+
+# Used when Redis is unavailable, newest last
+_local_store = deque(maxlen=1000)
+_lock = threading.Lock()
+_explained_at = {}
+_pending = 0
+_executor = None
+
+def bind_shape(parameters, executemany=False):
+    """Describe bound parameters by name and type, without their values."""
+    if executemany:
+        rows = list(parameters or [])
+        return {'rows': len(rows), 'shape': bind_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+def _origin():
+    """Route, or background context, that issued the current statement."""
+    if has_request_context():
+        rule = request.url_rule.rule if request.url_rule else request.path
+        return {'route': f'{request.method} {rule}', 'endpoint': request.endpoint}
+    return {'route': None, 'endpoint': None}
+
+def store(entry):
+    """Keep a slow-query entry, in Redis when available so every process sees it."""
+    size = current_app.config.get('SLOW_QUERY_STORE_SIZE', 200)
+    client = get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.lpush(REDIS_KEY, json.dumps(entry))
+            pipe.ltrim(REDIS_KEY, 0, size - 1)
+            pipe.execute()
+            return
+        except RedisError as e:
+            logger.warning('Could not store slow query: %s', str(e))
+    with _lock:
+        _local_store.append(entry)
+        while len(_local_store) > size:
+            _local_store.popleft()
+
+def recent_slow_queries(limit=50):
+    """Most recent slow queries, newest first."""
+    client = get_redis()
+    if client is not None:
+        try:
+            return [json.loads(item) for item in client.lrange(REDIS_KEY, 0, limit - 1)]
+        except RedisError as e:
+            logger.warning('Could not read slow queries: %s', str(e))
+    with _lock:
+        return list(reversed(_local_store))[:limit]
+
+def _should_explain(statement, key, executemany):
+    """Sample SELECTs for EXPLAIN, at most once per fingerprint per interval."""
+    global _pending
+    if executemany or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return False
+    if _WRITES.search(statement):
+        return False
+    if random.random() >= current_app.config.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1):
+        return False
+
+    interval = current_app.config.get('SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS', 300)
+    now = time.monotonic()
+    with _lock:
+        if now - _explained_at.get(key, -interval) < interval or _pending >= MAX_PENDING_EXPLAINS:
+            return False
+        if len(_explained_at) >= 1000:
+            _explained_at.clear()
+        _explained_at[key] = now
+        _pending += 1
+    return True
+
+def _explain(app, engine, entry, statement, parameters):
+    """Capture a plan on a separate connection, then store the entry."""
+    global _pending
+    try:
+        with app.app_context():
+            try:
+                with engine.connect() as connection:
+                    connection.info['explaining'] = True
+                    try:
+                        timeout = int(app.config.get('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 10000))
+                        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {timeout}')
+                        result = connection.exec_driver_sql(
+                            f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}', parameters
+                        )
+                        entry['plan'] = result.scalar()
+                    finally:
+                        connection.info.pop('explaining', None)
+                        connection.rollback()
+            except Exception as e:
+                entry['plan_error'] = str(e)
+            store(entry)
+    finally:
+        with _lock:
+            _pending -= 1
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+    return _executor
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _check_duration(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_slow_query_start', None)
+    if started is None or conn.info.get('explaining') or not has_app_context():
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    threshold = current_app.config.get('SLOW_QUERY_MS', 500)
+    if not threshold or elapsed_ms < threshold:
+        return
+
+    key = fingerprint(statement)
+    entry = {
+        'id': uuid.uuid4().hex,
+        'at': datetime.utcnow().isoformat(),
+        'duration_ms': round(elapsed_ms, 3),
+        'statement': key,
+        'binds': bind_shape(parameters, executemany),
+        'plan': None,
+        **_origin()
+    }
+    logger.warning(
+        'Slow query (%.1f ms) from %s: %s', elapsed_ms, entry['route'] or 'background', key
+    )
+
+    if _should_explain(statement, key, executemany):
+        _get_executor().submit(
+            _explain, current_app._get_current_object(), conn.engine, entry, statement, parameters
+        )
+    else:
+        store(entry)
@@ -1,12 +1,19 @@
+import time
+import click
+from flask import current_app
 from flask.cli import FlaskGroup
+from sqlalchemy import text
 from app import create_app, db
-from app.models import User, Program, Exercise, Workout, WorkoutExercise, AthleteProgram, PerformanceLog, FormAnalysis
+from app.models import User, Program, Exercise, Workout, WorkoutExercise, AthleteProgram, PerformanceLog, PerformanceLogPose, FormAnalysis, PersonalRecord
 
 cli = FlaskGroup(create_app=create_app)
 
 @cli.command("create_db")
 def create_db():
     """Creates the database tables."""
+    # Trigram indexes on exercises need the extension before the tables exist
+    db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.session.commit()
     db.create_all()
     print("Database tables created!")
 
@@ -46,19 +53,22 @@ def seed_db():
             name="Barbell Back Squat",
             type="strength",
             description="A compound exercise that primarily targets the quadriceps, hamstrings, and glutes.",
-            video_url="https://example.com/squat-form"
+            video_url="https://example.com/squat-form",
+            muscles_worked=["glutes", "hamstrings", "quadriceps"]
         ),
         Exercise(
             name="Barbell Bench Press",
             type="strength",
             description="A compound exercise that primarily targets the chest, shoulders, and triceps.",
-            video_url="https://example.com/bench-press-form"
+            video_url="https://example.com/bench-press-form",
+            muscles_worked=["chest", "shoulders", "triceps"]
         ),
         Exercise(
             name="Barbell Deadlift",
             type="strength",
             description="A compound exercise that targets the entire posterior chain.",
-            video_url="https://example.com/deadlift-form"
+            video_url="https://example.com/deadlift-form",
+            muscles_worked=["back", "glutes", "hamstrings"]
         )
     ]
     
@@ -71,5 +81,233 @@ def seed_db():
     db.session.commit()
     print("Database seeded!")
 
+@cli.command("backfill_records")
+@click.option("--athlete-id", "athlete_ids", type=int, multiple=True, help="Only backfill these athletes.")
+def backfill_records(athlete_ids):
+    """Rebuilds personal records from all performance logs."""
+    start = time.perf_counter()
+    count = PersonalRecord.backfill(athlete_ids or None)
+    print(f"Wrote {count} personal records in {time.perf_counter() - start:.2f}s")
+
+@cli.command("apply_storage_policies")
+def apply_storage_policies():
+    """Re-applies TimescaleDB compression and retention policies from Config."""
+    has_timescale = db.session.execute(text(
+        "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'"
+    )).scalar()
+    is_hypertable = has_timescale and db.session.execute(text(
+        "SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'performance_logs'"
+    )).scalar()
+    if not is_hypertable:
+        print("performance_logs is not a TimescaleDB hypertable; nothing to do")
+        return
+
+    compress_after = f"{current_app.config['TIMESCALE_COMPRESS_AFTER_DAYS']} days"
+    pose_retention = f"{current_app.config['POSE_RETENTION_DAYS']} days"
+    for table in ("performance_logs", "performance_log_poses"):
+        db.session.execute(text("SELECT remove_compression_policy(:table, if_exists => true)"), {"table": table})
+        db.session.execute(
+            text("SELECT add_compression_policy(:table, CAST(:interval AS INTERVAL))"),
+            {"table": table, "interval": compress_after}
+        )
+    db.session.execute(text("SELECT remove_retention_policy('performance_log_poses', if_exists => true)"))
+    db.session.execute(
+        text("SELECT add_retention_policy('performance_log_poses', CAST(:interval AS INTERVAL))"),
+        {"interval": pose_retention}
+    )
+    db.session.commit()
+    print(f"Compressing chunks older than {compress_after}, dropping pose data older than {pose_retention}")
+
+@cli.command("archive_logs")
+@click.option("--older-than-days", type=int, default=None, help="Archive logs older than this (default ARCHIVE_AFTER_DAYS).")
+def archive_logs(older_than_days):
+    """Moves old performance logs, pose payloads and form analyses to Parquet files."""
+    from datetime import datetime, timedelta
+    from app.utils.archive import archive_before
+
+    days = older_than_days or current_app.config['ARCHIVE_AFTER_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    start = time.perf_counter()
+    totals = archive_before(cutoff)
+    print(
+        f"Archived {totals['performance_logs']} performance logs, "
+        f"{totals['performance_log_poses']} pose payloads and "
+        f"{totals['form_analyses']} form analyses older than {cutoff:%Y-%m-%d} "
+        f"to {current_app.config['ARCHIVE_DIR']} in {time.perf_counter() - start:.2f}s"
+    )
+
+@cli.command("import_history")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--athlete-id", type=int, default=None, help="Athlete for rows without an athlete_email column.")
+@click.option("--batch-size", type=int, default=None, help="Rows per COPY batch (default IMPORT_BATCH_SIZE).")
+def import_history(path, athlete_id, batch_size):
+    """Imports historical sets from a CSV file (export spreadsheets as CSV)."""
+    from app.utils.importer import import_history as run_import
+
+    def progress(stats):
+        print(f"  {stats.imported} imported, {stats.rejected} rejected")
+
+    with open(path, newline='', encoding='utf-8-sig') as stream:
+        stats = run_import(stream, athlete_id=athlete_id, batch_size=batch_size, progress=progress)
+
+    result = stats.to_dict()
+    print(
+        f"Imported {result['imported']} of {result['rows']} rows in {result['elapsed_seconds']}s "
+        f"({result['rows_per_second']} rows/s)"
+    )
+    for reject in result['rejects']:
+        print(f"  line {reject['line']}: {reject['error']}")
+    if result['rejected'] > len(result['rejects']):
+        print(f"  ... and {result['rejected'] - len(result['rejects'])} more rejected rows")
+
+@cli.command("slow_queries")
+@click.option("--limit", type=int, default=20, help="Number of recent slow queries to show.")
+@click.option("--plans/--no-plans", default=False, help="Print captured EXPLAIN plans.")
+def slow_queries(limit, plans):
+    """Shows recent slow queries, newest first."""
+    import json
+    from app.utils.slow_queries import recent_slow_queries
+
+    entries = recent_slow_queries(limit)
+    if not entries:
+        print(f"No queries slower than {current_app.config['SLOW_QUERY_MS']} ms recorded")
+    for entry in entries:
+        print(f"{entry['at']}  {entry['duration_ms']:.1f} ms  {entry['route'] or 'background'}")
+        print(f"  {entry['statement']}")
+        print(f"  binds: {json.dumps(entry['binds'])}")
+        if entry.get('plan_error'):
+            print(f"  plan failed: {entry['plan_error']}")
+        elif plans and entry.get('plan'):
+            print(json.dumps(entry['plan'], indent=2))
+
+@cli.command("bench_set_logging")
+@click.option("--workout-id", type=int, required=True, help="Workout whose exercises receive the sets.")
+@click.option("--athlete-email", default="athlete@example.com", help="Athlete to log the sets as.")
+@click.option("--sets", "set_count", type=int, default=200, help="Number of sets to log per run.")
+def bench_set_logging(workout_id, athlete_email, set_count):
+    """Benchmarks per-set logging against the bulk set-logging endpoint."""
+    from app.utils.auth import create_access_token
+
+    athlete = User.query.filter_by(email=athlete_email).first()
+    workout_exercises = WorkoutExercise.query.filter_by(workout_id=workout_id).all()
+    if not athlete or not workout_exercises:
+        print("Athlete or workout exercises not found.")
+        return
+
+    headers = {"Authorization": f"Bearer {create_access_token(athlete.id, role=athlete.role)}"}
+    url = f"/api/v1/workouts/{workout_id}/sets"
+    sets = [
+        {
+            "workout_exercise_id": workout_exercises[i % len(workout_exercises)].id,
+            "set_number": i + 1,
+            "weight": 100,
+            "reps": 5,
+            "rpe": 8
+        }
+        for i in range(set_count)
+    ]
+    client = current_app.test_client()
+    created_ids = []
+
+    # One request and one commit per set, as the per-set endpoints do
+    start = time.perf_counter()
+    for item in sets:
+        response = client.post(url, json={"sets": [item]}, headers=headers)
+        created_ids.extend(response.get_json().get("ids", []))
+    per_set_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post(url, json={"sets": sets}, headers=headers)
+    created_ids.extend(response.get_json().get("ids", []))
+    bulk_elapsed = time.perf_counter() - start
+
+    print(f"Per-set: {set_count / per_set_elapsed:.1f} sets/s ({per_set_elapsed:.3f}s)")
+    print(f"Bulk:    {set_count / bulk_elapsed:.1f} sets/s ({bulk_elapsed:.3f}s)")
+
+    # Remove the benchmark rows again, with the records and analytics they fed
+    from app.utils.analytics import mark_history_changed
+
+    FormAnalysis.query.filter(FormAnalysis.performance_log_id.in_(created_ids)).delete(synchronize_session=False)
+    PerformanceLogPose.query.filter(PerformanceLogPose.performance_log_id.in_(created_ids)).delete(synchronize_session=False)
+    PerformanceLog.query.filter(PerformanceLog.id.in_(created_ids)).delete(synchronize_session=False)
+    PersonalRecord.rebuild(db.session, {(athlete.id, we.exercise_id) for we in workout_exercises})
+    mark_history_changed(db.session, athlete.id)
+    db.session.commit()
+
+@cli.command("bench_login")
+@click.option("--email", default="athlete@example.com", help="User to log in as.")
+@click.option("--password", default="password123", help="That user's password.")
+@click.option("--concurrency", type=int, default=16, help="Concurrent clients.")
+@click.option("--requests", "request_count", type=int, default=200, help="Total login requests.")
+def bench_login(email, password, concurrency, request_count):
+    """Benchmarks login throughput and latency under concurrent load."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    app = current_app._get_current_object()
+    per_client = max(request_count // concurrency, 1)
+
+    def run_client(_):
+        client = app.test_client()
+        results = []
+        for _ in range(per_client):
+            start = time.perf_counter()
+            response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+            results.append((response.status_code, time.perf_counter() - start))
+        return results
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = [item for batch in executor.map(run_client, range(concurrency)) for item in batch]
+    elapsed = time.perf_counter() - start
+
+    ok = sorted(latency for status, latency in results if status == 200)
+    shed = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(ok) - shed
+    print(f"{len(results)} logins with {concurrency} clients in {elapsed:.2f}s ({len(ok) / elapsed:.1f} logins/s)")
+    print(f"  hash method: {current_app.config['PASSWORD_HASH_METHOD']}, workers: {current_app.config['PASSWORD_HASH_WORKERS']}")
+    if ok:
+        print(f"  latency p50 {ok[len(ok) // 2] * 1000:.1f} ms, p95 {ok[min(int(len(ok) * 0.95), len(ok) - 1)] * 1000:.1f} ms")
+    print(f"  shed (503): {shed}, failed: {failed}")
+
+@cli.command("bench_json")
+@click.option("--programs", "program_count", type=int, default=20, help="Program trees to serialize.")
+@click.option("--poses", "pose_count", type=int, default=20, help="Pose payloads to serialize.")
+@click.option("--rounds", type=int, default=20, help="Times each payload is serialized.")
+def bench_json(program_count, pose_count, rounds):
+    """Benchmarks the JSON providers on real program and pose payloads."""
+    from app.utils.json_provider import JSON_PROVIDERS, orjson
+
+    app = current_app._get_current_object()
+    payloads = {
+        "programs": [
+            program.to_dict(include_workouts=True)
+            for program in Program.query.order_by(Program.id).limit(program_count)
+        ],
+        "poses": [
+            {"performance_log_id": pose.performance_log_id, "pose_data": pose.pose_data}
+            for pose in PerformanceLogPose.query.order_by(PerformanceLogPose.logged_at.desc()).limit(pose_count)
+        ],
+    }
+    providers = {name: cls(app) for name, cls in JSON_PROVIDERS.items() if name != "orjson" or orjson is not None}
+    if orjson is None:
+        print("orjson is not installed; benchmarking stdlib only")
+
+    for kind, items in payloads.items():
+        if not items:
+            print(f"{kind}: no payloads found")
+            continue
+        for name, provider in providers.items():
+            size = sum(len(provider.dumps_bytes(item)) for item in items)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for item in items:
+                    provider.dumps_bytes(item)
+            elapsed = time.perf_counter() - start
+            per_payload = elapsed / (rounds * len(items)) * 1000
+            print(
+                f"{kind:<9} {name:<7} {per_payload:8.3f} ms/payload  "
+                f"{size * rounds / elapsed / 1e6:8.1f} MB/s  ({size / len(items) / 1024:.1f} KiB avg)"
+            )
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,29 @@
+"""Add composite indexes backing keyset pagination
+
+Revision ID: ff99be03e566
+Revises: bf9b9962e431
+Create Date: 2026-10-19 09:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'ff99be03e566'
+down_revision = 'bf9b9962e431'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # History listings page on (logged_at, id) within a single athlete
+    op.create_index(
+        'ix_performance_logs_athlete_logged_at_id',
+        'performance_logs',
+        ['athlete_id', sa.text('logged_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_performance_logs_athlete_logged_at_id', table_name='performance_logs')
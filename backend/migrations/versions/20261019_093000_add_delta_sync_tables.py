@@ -0,0 +1,66 @@
+"""Add tombstones, sync receipts and updated_at sync indexes
+
+Revision ID: 331be9a7dd7b
+Revises: ff99be03e566
+Create Date: 2026-10-19 09:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '331be9a7dd7b'
+down_revision = 'ff99be03e566'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = [
+    'exercises',
+    'programs',
+    'workouts',
+    'workout_exercises',
+    'athlete_programs',
+    'performance_logs',
+]
+
+
+def upgrade():
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('athlete_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_athlete_id', 'tombstones', ['athlete_id'], unique=False)
+
+    op.create_table(
+        'sync_receipts',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_sync_receipts_user_key')
+    )
+
+    # Sync pages on (updated_at, id); rows without updated_at would never be seen
+    for table in SYNCED_TABLES:
+        op.execute(
+            f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+            f"WHERE updated_at IS NULL"
+        )
+        op.create_index(f'ix_{table}_updated_at_id', table, ['updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    for table in reversed(SYNCED_TABLES):
+        op.drop_index(f'ix_{table}_updated_at_id', table_name=table)
+    op.drop_table('sync_receipts')
+    op.drop_index('ix_tombstones_athlete_id', table_name='tombstones')
+    op.drop_table('tombstones')
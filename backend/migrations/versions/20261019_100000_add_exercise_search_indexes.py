@@ -0,0 +1,46 @@
+"""Add muscles_worked, full-text search vector and trigram indexes to exercises
+
+Revision ID: 9a5f72b4963c
+Revises: 331be9a7dd7b
+Create Date: 2026-10-19 10:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9a5f72b4963c'
+down_revision = '331be9a7dd7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.add_column('exercises', sa.Column(
+        'muscles_worked', postgresql.ARRAY(sa.String(length=50)),
+        nullable=False, server_default='{}'
+    ))
+    op.execute(
+        "ALTER TABLE exercises ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+
+    op.create_index('ix_exercises_search_vector', 'exercises', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_exercises_name_trgm', 'exercises', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_exercises_muscles_worked', 'exercises', ['muscles_worked'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_exercises_muscles_worked', table_name='exercises')
+    op.drop_index('ix_exercises_name_trgm', table_name='exercises')
+    op.drop_index('ix_exercises_search_vector', table_name='exercises')
+    op.drop_column('exercises', 'search_vector')
+    op.drop_column('exercises', 'muscles_worked')
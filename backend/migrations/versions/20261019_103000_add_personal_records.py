@@ -0,0 +1,41 @@
+"""Add personal_records table
+
+Revision ID: 6d9e5f7b0609
+Revises: 9a5f72b4963c
+Create Date: 2026-10-19 10:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '6d9e5f7b0609'
+down_revision = '9a5f72b4963c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'personal_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('athlete_id', sa.Integer(), nullable=False),
+        sa.Column('exercise_id', sa.Integer(), nullable=False),
+        sa.Column('record_type', sa.String(length=20), nullable=False),
+        sa.Column('reps', sa.Integer(), nullable=False),
+        sa.Column('value', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('performance_log_id', sa.Integer(), nullable=True),
+        sa.Column('achieved_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['athlete_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('athlete_id', 'exercise_id', 'record_type', 'reps',
+                            name='uq_personal_records_key')
+    )
+    # Existing history is loaded with `python manage.py backfill_records`
+
+
+def downgrade():
+    op.drop_table('personal_records')
@@ -0,0 +1,102 @@
+"""Move pose data out of performance_logs and add storage policies
+
+Revision ID: 80a8640e88cf
+Revises: 6d9e5f7b0609
+Create Date: 2026-10-19 11:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '80a8640e88cf'
+down_revision = '6d9e5f7b0609'
+branch_labels = None
+depends_on = None
+
+COMPRESS_AFTER = '30 days'
+POSE_RETENTION = '365 days'
+
+
+def upgrade():
+    # Databases initialized from an older docker init script already have it
+    if not sa.inspect(op.get_bind()).has_table('performance_log_poses'):
+        op.create_table(
+            'performance_log_poses',
+            sa.Column('performance_log_id', sa.Integer(), nullable=False),
+            sa.Column('logged_at', sa.DateTime(), nullable=False),
+            sa.Column('pose_data', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('performance_log_id', 'logged_at')
+        )
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'performance_logs' AND column_name = 'pose_data'
+            ) THEN
+                INSERT INTO performance_log_poses (performance_log_id, logged_at, pose_data, created_at)
+                SELECT id, logged_at, pose_data, CURRENT_TIMESTAMP
+                FROM performance_logs
+                WHERE pose_data IS NOT NULL;
+            END IF;
+        END $$;
+    """)
+    op.execute('ALTER TABLE performance_logs DROP COLUMN IF EXISTS pose_data')
+
+    # Only where performance_logs is already a TimescaleDB hypertable
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+                IF EXISTS (
+                    SELECT 1 FROM timescaledb_information.hypertables
+                    WHERE hypertable_name = 'performance_logs'
+                ) THEN
+                    PERFORM create_hypertable('performance_log_poses', 'logged_at',
+                                              migrate_data => true, if_not_exists => true);
+
+                    ALTER TABLE performance_logs SET (
+                        timescaledb.compress,
+                        timescaledb.compress_segmentby = 'athlete_id',
+                        timescaledb.compress_orderby = 'logged_at DESC, id DESC'
+                    );
+                    ALTER TABLE performance_log_poses SET (
+                        timescaledb.compress,
+                        timescaledb.compress_orderby = 'logged_at DESC, performance_log_id DESC'
+                    );
+                    PERFORM add_compression_policy('performance_logs', INTERVAL '{COMPRESS_AFTER}', if_not_exists => true);
+                    PERFORM add_compression_policy('performance_log_poses', INTERVAL '{COMPRESS_AFTER}', if_not_exists => true);
+                    PERFORM add_retention_policy('performance_log_poses', INTERVAL '{POSE_RETENTION}', if_not_exists => true);
+                END IF;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+                IF EXISTS (
+                    SELECT 1 FROM timescaledb_information.hypertables
+                    WHERE hypertable_name = 'performance_logs'
+                ) THEN
+                    PERFORM remove_compression_policy('performance_logs', if_exists => true);
+                    PERFORM decompress_chunk(c, true) FROM show_chunks('performance_logs') c;
+                    ALTER TABLE performance_logs SET (timescaledb.compress = false);
+                END IF;
+            END IF;
+        END $$;
+    """)
+
+    op.add_column('performance_logs', sa.Column('pose_data', sa.JSON(), nullable=True))
+    op.execute("""
+        UPDATE performance_logs pl SET pose_data = p.pose_data
+        FROM performance_log_poses p
+        WHERE p.performance_log_id = pl.id AND p.logged_at = pl.logged_at
+    """)
+    op.drop_table('performance_log_poses')
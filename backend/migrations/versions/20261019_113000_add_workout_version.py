@@ -0,0 +1,23 @@
+"""Add version column to workouts
+
+Revision ID: db364648acf7
+Revises: 80a8640e88cf
+Create Date: 2026-10-19 11:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'db364648acf7'
+down_revision = '80a8640e88cf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('workouts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('workouts', 'version')
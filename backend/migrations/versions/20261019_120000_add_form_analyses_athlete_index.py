@@ -0,0 +1,25 @@
+"""Add athlete/created_at index on form_analyses
+
+Revision ID: 69fd4a919050
+Revises: db364648acf7
+Create Date: 2026-10-19 12:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '69fd4a919050'
+down_revision = 'db364648acf7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Latest form score per athlete for the coach dashboard
+    op.create_index('ix_form_analyses_athlete_created_at', 'form_analyses',
+                    ['athlete_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_form_analyses_athlete_created_at', table_name='form_analyses')
@@ -0,0 +1,25 @@
+"""Add deleted_at/id index on tombstones
+
+Revision ID: 5c2e8d41a7b3
+Revises: 69fd4a919050
+Create Date: 2026-10-19 12:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8d41a7b3'
+down_revision = '69fd4a919050'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sync pages tombstones on (deleted_at, id) behind the settle window
+    op.create_index('ix_tombstones_deleted_at_id', 'tombstones',
+                    ['deleted_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tombstones_deleted_at_id', table_name='tombstones')
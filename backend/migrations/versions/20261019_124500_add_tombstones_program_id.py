@@ -0,0 +1,26 @@
+"""Add program_id to tombstones
+
+Revision ID: e7a3b96c1d52
+Revises: 5c2e8d41a7b3
+Create Date: 2026-10-19 12:45:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b96c1d52'
+down_revision = '5c2e8d41a7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lets coaches sync roster removals from their programs
+    op.add_column('tombstones', sa.Column('program_id', sa.Integer(), nullable=True))
+    op.create_index('ix_tombstones_program_id', 'tombstones', ['program_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tombstones_program_id', table_name='tombstones')
+    op.drop_column('tombstones', 'program_id')
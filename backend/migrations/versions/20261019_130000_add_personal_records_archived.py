@@ -0,0 +1,25 @@
+"""Add archived flag to personal_records
+
+Revision ID: 3f81c0d9a6e4
+Revises: e7a3b96c1d52
+Create Date: 2026-10-19 13:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f81c0d9a6e4'
+down_revision = 'e7a3b96c1d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Records of archived logs survive rebuilds; those of deleted logs do not
+    op.add_column('personal_records', sa.Column('archived', sa.Boolean(), nullable=False,
+                                                server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('personal_records', 'archived')
@@ -92,6 +92,10 @@ CREATE TABLE performance_logs (
 -- Convert performance_logs to a hypertable
 SELECT create_hypertable('performance_logs', 'logged_at');
 
+-- performance_log_poses, compression and retention policies are created by
+-- migration 80a8640e88cf, after the baseline migrations have altered
+-- performance_logs (compressed hypertables reject column type changes)
+
 -- Create indexes for better query performance
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_programs_coach ON programs(coach_id);